@@ -1,14 +1,23 @@
 #=============================================================================
 # IMPORTS & CONFIGURATIONS
 #=============================================================================
-from flask import Flask, render_template, redirect, request, session, url_for, jsonify
+from flask import Flask, Response, g, make_response, render_template, redirect, request, session, url_for, jsonify
 from functools import wraps
 from config import Config
 from task_manager import TaskManager
+from task_index import TaskIndex
+from task_archive import read_ndjson
 from google_auth import GoogleAuth
 from magic_sort import MagicSort
+from change_feed import ChangeFeed
+from profiling import RequestProfiler
+from background import JobRunner, JobQueueFull
+from session_store import ServerSideSessionInterface, create_session_store
+from metrics import registry, REQUEST_BUCKETS
+import hmac
 import os
-from typing import Callable
+import time
+from typing import Any, Callable, Dict, Optional
 
 #=============================================================================
 # APPLICATION INITIALIZATION
@@ -21,15 +30,27 @@ app = Flask(__name__,
             static_folder=Config.STATIC_FOLDER
             )
 app.secret_key = Config.SECRET_KEY
+app.session_interface = ServerSideSessionInterface(create_session_store(), Config.SESSION_LIFETIME)
 
 # Initialize services with config
-task_manager = TaskManager()
+task_manager = TaskManager(Config.DATA_PATH, Config.ARCHIVE_PATH, Config.ARCHIVE_AFTER_DAYS)
 google_auth = GoogleAuth(Config.GOOGLE_CLIENT_ID, Config.GOOGLE_CLIENT_SECRET)
 magic_sorter = MagicSort()
+change_feed = ChangeFeed(task_manager.epoch, task_manager.revision, Config.CHANGE_FEED_HISTORY)
+task_manager.add_listener(change_feed.publish)
+profiler = RequestProfiler(app)
+jobs = JobRunner(Config.JOB_WORKERS, Config.JOB_QUEUE_MAX, Config.JOB_HISTORY)
 
 #=============================================================================
 # AUTHENTICATION & SECURITY
 #=============================================================================
+def session_credentials() -> Optional[Any]:
+    """Google credentials for the current session, parsed once and cached"""
+    credentials_json = session.get('credentials')
+    if not credentials_json:
+        return None
+    return google_auth.credentials_for(session.sid, credentials_json)
+
 def login_required(f: Callable) -> Callable:
     """Ensures user authentication before accessing protected routes
     
@@ -45,6 +66,96 @@ def login_required(f: Callable) -> Callable:
         return f(*args, **kwargs)
     return decorated_function
 
+#=============================================================================
+# METRICS
+#=============================================================================
+REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds', 'Flask request latency by route',
+    labels=('route', 'method', 'status'), buckets=REQUEST_BUCKETS)
+
+@app.before_request
+def start_request_timer() -> None:
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_duration(response: Response) -> Response:
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_DURATION.observe(time.perf_counter() - started,
+                                 route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.route("/metrics")
+def metrics():
+    """Exports all metrics in the Prometheus text format
+    
+    Protected by a bearer token when Config.METRICS_TOKEN is set.
+    """
+    if Config.METRICS_TOKEN:
+        expected = f"Bearer {Config.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), expected):
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    return Response(registry.render_prometheus(),
+                    mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+#=============================================================================
+# CONDITIONAL RESPONSES
+#=============================================================================
+def not_modified(etag: str) -> Optional[Response]:
+    """Returns a 304 response if the client already holds this revision
+    
+    Args:
+        etag (str): Entity tag of the current representation
+    Returns:
+        Optional[Response]: Empty 304 response, or None if the body must be sent
+    """
+    if request.if_none_match.contains(etag):
+        return with_etag(Response(status=304), etag)
+    return None
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Attaches the ETag and requires clients to revalidate before reuse"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+#=============================================================================
+# BACKGROUND JOBS
+#=============================================================================
+def wants_async() -> bool:
+    """Whether the client asked for a 202 and a job to poll (RFC 7240)"""
+    return Config.ASYNC_JOBS_ENABLED and 'respond-async' in request.headers.get('Prefer', '')
+
+def submit_job(name: str, function: Callable[..., Any], *args: Any) -> Response:
+    """Queue a job for the current user and answer 202 with where to poll it"""
+    try:
+        job = jobs.submit(name, function, *args, owner=session.get('user', {}).get('email'))
+    except JobQueueFull as e:
+        response = jsonify({"status": "error", "message": str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    response = jsonify({"status": "accepted", "job": job})
+    response.status_code = 202
+    response.headers['Location'] = url_for('job_status', job_id=job['id'])
+    response.headers['Preference-Applied'] = 'respond-async'
+    return response
+
+@app.route("/jobs/<job_id>")
+@login_required
+def job_status(job_id: str):
+    """Returns the state of a background job started by this user
+    
+    Returns:
+        JSON: Status and job (status is queued, running, succeeded or failed;
+        result or error is set once it finishes)
+    """
+    job = jobs.get(job_id, owner=session.get('user', {}).get('email'))
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify({"status": "success", "job": job})
+
 #=============================================================================
 # AUTHENTICATION ROUTES
 #=============================================================================
@@ -86,9 +197,11 @@ def oauth2callback():
             url_for('oauth2callback', _external=True)
         )
 
-        # Store credentials and user info in session
+        # Store credentials and user info server-side under a fresh session id
+        session.regenerate()
+        session.pop('state', None)
         session['credentials'] = credentials
-        user_info = google_auth.get_user_info(credentials)
+        user_info = google_auth.get_user_info(google_auth.credentials_for(session.sid, credentials))
         session['user'] = user_info
         session['isAuth'] = True
         
@@ -103,6 +216,7 @@ def oauth2callback():
 @app.route("/logout")
 def logout():
     """Clear session and logout user"""
+    google_auth.forget_credentials(session.sid)
     session.clear()
     return redirect(url_for("login"))
 
@@ -112,19 +226,136 @@ def logout():
 @app.route("/")
 @login_required
 def index():
-    """Main application page displaying task list"""
+    """Main application page displaying the first page of the task list"""
     try:
-        tasks = task_manager.load_tasks()
-        return render_template("index.html", 
-                            tasks=tasks, 
+        user = session.get('user', {})
+        # Computed before reading tasks so a concurrent change never gets an old tag
+        etag = task_manager.etag(f"index:{user.get('email', '')}:{Config.TASK_PAGE_SIZE}")
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        revision = change_feed.token(task_manager.revision)
+        page = task_manager.list_tasks(limit=Config.TASK_PAGE_SIZE)
+        return with_etag(make_response(render_template("index.html", 
+                            tasks=page['tasks'], 
                             initial_tasks=[],
-                            user=session.get('user', {}))  # Pass user info explicitly
+                            next_cursor=page['next_cursor'],
+                            revision=revision,
+                            user=user)), etag)  # Pass user info explicitly
     except Exception as e:
         app.logger.error(f"Error loading tasks: {str(e)}")
         return render_template("index.html", 
                             tasks=[], 
+                            next_cursor=None,
+                            revision=None,
                             user=session.get('user', {}))
 
+@app.route("/tasks")
+@login_required
+def list_tasks():
+    """Returns one page of tasks
+    
+    Query Parameters:
+        limit (int): Page size, capped at Config.TASK_PAGE_SIZE_MAX
+        cursor (str): Opaque cursor from a previous page's next_cursor
+        quadrant (str): Comma-separated quadrants (Q1-Q4, "none" for unsorted)
+        completed (str): "true" or "false"
+        updated_since (str): ISO timestamp; only tasks updated at or after it
+        sort (str): position (default), created_at or updated_at
+        order (str): asc (default) or desc
+    Returns:
+        JSON: Status, tasks and next_cursor (null on the last page)
+    """
+    try:
+        limit = min(int(request.args.get("limit", Config.TASK_PAGE_SIZE)), Config.TASK_PAGE_SIZE_MAX)
+        quadrant = request.args.get("quadrant")
+        quadrants = None
+        if quadrant is not None:
+            quadrants = ['' if q.strip().lower() == 'none' else q.strip().upper()
+                         for q in quadrant.split(',')]
+        completed = request.args.get("completed")
+        if completed is not None:
+            completed = completed.lower() == 'true'
+        sort = request.args.get("sort", "position")
+        order = request.args.get("order", "asc")
+        cursor = request.args.get("cursor")
+        # A bad query is a 400 even when the client holds a matching tag
+        TaskIndex.validate_query(sort, order, cursor, limit)
+
+        etag = task_manager.etag(f"tasks:{request.query_string.decode('utf-8', 'replace')}")
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        page = task_manager.list_tasks(
+            quadrants=quadrants,
+            completed=completed,
+            updated_since=request.args.get("updated_since"),
+            sort=sort,
+            order=order,
+            cursor=cursor,
+            limit=limit
+        )
+        return with_etag(jsonify({"status": "success", **page}), etag)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error listing tasks: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/search")
+@login_required
+def search_tasks():
+    """Full-text search over task content
+
+    Query Parameters:
+        q (str): Search text; the last word also matches as a prefix, expanded
+            to its SearchIndex.MAX_PREFIX_TERMS most frequent completions
+        limit (int): Maximum results, capped at Config.SEARCH_LIMIT_MAX
+    Returns:
+        JSON: Status and matching tasks, best first, each with a score
+    """
+    try:
+        query = request.args.get("q", "")
+        limit = min(int(request.args.get("limit", Config.SEARCH_LIMIT)), Config.SEARCH_LIMIT_MAX)
+
+        etag = task_manager.etag(f"search:{request.query_string.decode('utf-8', 'replace')}")
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        tasks = task_manager.search_tasks(query, limit=limit)
+        return with_etag(jsonify({"status": "success", "tasks": tasks}), etag)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error searching tasks: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/tasks/changes")
+@login_required
+def task_changes():
+    """Streams task deltas as server-sent events
+    
+    Clients resume from the Last-Event-ID header (sent automatically by
+    EventSource on reconnect) or the ``since`` query parameter. Each event
+    carries a revision and an op: add, update, delete or reset.
+    
+    The stream holds a request thread while open, so it closes after
+    Config.CHANGE_FEED_MAX_HEARTBEATS heartbeats and the client reconnects.
+    """
+    token = request.headers.get("Last-Event-ID") or request.args.get("since")
+    since = change_feed.parse_token(token)
+    # A token from another process can't be resumed; -1 forces a reset event
+    if token and since is None:
+        since = -1
+    return Response(
+        change_feed.stream(since, Config.CHANGE_FEED_HEARTBEAT, Config.CHANGE_FEED_MAX_HEARTBEATS),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 #=============================================================================
 # TASK CRUD API ENDPOINTS
 #=============================================================================
@@ -178,31 +409,192 @@ def delete_task():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
+#=============================================================================
+# TASK ARCHIVE ROUTES
+#=============================================================================
+@app.route("/tasks/archived")
+@login_required
+def list_archived_tasks():
+    """Returns one page of archived tasks, most recently archived first
+    
+    Query Parameters:
+        offset (int): Tasks to skip, from a previous page's next_offset
+        limit (int): Page size, capped at Config.TASK_PAGE_SIZE_MAX
+    Returns:
+        JSON: Status, tasks, total and next_offset (null on the last page)
+    """
+    try:
+        offset = int(request.args.get("offset", 0))
+        limit = min(int(request.args.get("limit", Config.TASK_PAGE_SIZE)), Config.TASK_PAGE_SIZE_MAX)
+        return jsonify({"status": "success", **task_manager.list_archived(offset, limit)})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error listing archived tasks: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/tasks/archived/restore", methods=["POST"])
+@login_required
+def restore_archived_tasks():
+    """Moves archived tasks back to the task list
+    
+    Request Body:
+        id (str): Task ID; repeat to restore several tasks
+    Returns:
+        JSON: Status and restored tasks
+    """
+    try:
+        task_ids = request.form.getlist("id")
+        if not task_ids:
+            return jsonify({"status": "error", "message": "Task ID is missing"})
+        
+        tasks = task_manager.restore_tasks(task_ids)
+        if tasks:
+            return jsonify({"status": "success", "tasks": tasks})
+        return jsonify({"status": "error", "message": "Task not found"})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+@app.route("/tasks/archive", methods=["POST"])
+@login_required
+def archive_tasks():
+    """Archives completed tasks now instead of waiting for the next sweep
+    
+    Request Body:
+        older_than_days (float): Optional, defaults to Config.ARCHIVE_AFTER_DAYS
+    Returns:
+        JSON: Status and number of tasks archived
+    """
+    try:
+        older_than_days = request.form.get("older_than_days")
+        days = float(older_than_days) if older_than_days else Config.ARCHIVE_AFTER_DAYS
+        if days < 0:
+            raise ValueError("older_than_days must be >= 0")
+        return jsonify({"status": "success", "archived": task_manager.archive_completed(days)})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
+#=============================================================================
+# BULK IMPORT/EXPORT ROUTES
+#=============================================================================
+@app.route("/tasks/export")
+@login_required
+def export_tasks():
+    """Streams all tasks as NDJSON, one task per line
+    
+    Query Parameters:
+        archived (str): "true" to append archived tasks
+    Returns:
+        NDJSON download, generated task by task
+    """
+    include_archived = request.args.get("archived", "false").lower() == "true"
+    return Response(
+        task_manager.export_tasks(include_archived),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=tasks.ndjson"}
+    )
+
+@app.route("/tasks/import", methods=["POST"])
+@login_required
+def import_tasks():
+    """Imports tasks from an NDJSON body or an uploaded "file" field
+    
+    The body is parsed line by line as it is read and applied in chunks
+    of Config.IMPORT_CHUNK_SIZE. Known ids keep whichever copy has the
+    newer updated_at.
+    
+    Returns:
+        JSON: Status and counts of added, updated, unchanged, archived
+        and invalid records
+    """
+    try:
+        upload = request.files.get("file") if request.mimetype == "multipart/form-data" else None
+        lines = upload.stream if upload else request.stream
+        stats = task_manager.import_tasks(lines, Config.IMPORT_CHUNK_SIZE)
+        return jsonify({"status": "success", **stats})
+    except Exception as e:
+        app.logger.error(f"Error importing tasks: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)})
+
 #=============================================================================
 # TASK SYNC ROUTES
 #=============================================================================
+def sync_archive_with_drive(credentials: Any) -> None:
+    """Exchange the task archive with its Drive copy when either side changed
+    
+    The archive is downloaded only when its Drive modifiedTime differs from
+    the one last seen, and uploaded only when the file changed since the
+    last upload. Both are remembered across restarts, so syncs normally
+    neither transfer nor load the archive.
+    """
+    archive = task_manager.archive
+    file_metadata = google_auth.get_drive_file_metadata(credentials, Config.ARCHIVE_BACKUP_FILENAME)
+    
+    if file_metadata and file_metadata.get('modifiedTime') != archive.cloud_version:
+        content = google_auth.download_file(credentials, file_metadata['id'])
+        task_manager.merge_archive(read_ndjson(content.splitlines(), app.logger))
+        archive.mark_synced(file_metadata.get('modifiedTime'))
+    
+    if archive.needs_upload:
+        signature = archive.signature()
+        uploaded = google_auth.upload_file(credentials, archive.path, 'application/x-ndjson',
+                                           Config.ARCHIVE_BACKUP_FILENAME)
+        # Our own upload is the cloud copy now; no need to download it back
+        archive.mark_synced(uploaded.get('modifiedTime'), signature)
+
+def sync_with_drive(credentials: Any) -> Dict[str, Any]:
+    """Merge the Drive backup into local tasks, then upload the result
+    
+    Credentials are passed in rather than read from the session so this
+    can run as a background job outside the request.
+    """
+    # First check if there's a cloud version
+    file_metadata = google_auth.get_drive_file_metadata(credentials)
+    
+    changed = False
+    if file_metadata:
+        # Download and merge cloud data
+        cloud_data = google_auth.download_from_drive(credentials, file_metadata['id'])
+        changed = task_manager.merge_tasks(cloud_data)
+    
+    # Archive before uploading so other devices see the tasks move too
+    changed = task_manager.archive_completed() > 0 or changed
+    sync_archive_with_drive(credentials)
+    
+    # Upload current state to cloud, including import chunks not yet saved
+    task_manager.flush()
+    file_id = google_auth.upload_to_drive(credentials, task_manager.tasks_file)
+    # Lets background-job clients skip reloading an unchanged list
+    return {"message": "Tasks synced successfully", "fileId": file_id, "changed": changed}
+
 @app.route("/sync-tasks", methods=["POST"])
 @login_required
 def sync_tasks():
-    """Sync tasks with Google Drive"""
+    """Sync tasks with Google Drive
+    
+    With "Prefer: respond-async" the sync runs as a background job and the
+    response is 202 with the job to poll at /jobs/<id>.
+    """
     try:
-        credentials = session.get('credentials')
+        credentials = session_credentials()
         if not credentials:
             return jsonify({"status": "error", "message": "Not authenticated with Google"})
         
-        # First check if there's a cloud version
-        file_metadata = google_auth.get_drive_file_metadata(credentials)
+        if wants_async():
+            return submit_job('sync', sync_with_drive, credentials)
         
-        if file_metadata:
-            # Download and merge cloud data
-            cloud_data = google_auth.download_from_drive(credentials, file_metadata['id'])
-            task_manager.merge_tasks(cloud_data)
+        synced = sync_with_drive(credentials)
         
-        # Upload current state to cloud
-        file_id = google_auth.upload_to_drive(credentials, task_manager.tasks_file)
+        # Get final task list and its tag together; the in-memory list is
+        # authoritative, the file may lag it during an import
+        current_tasks, etag = task_manager.snapshot("sync")
         
-        # Get final task list with proper formatting
-        current_tasks = task_manager.load_tasks()
+        # Clients that already hold this revision skip the task payload
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
         # Ensure each task has required fields
         formatted_tasks = [{
@@ -214,12 +606,11 @@ def sync_tasks():
             'updated_at': task.get('updated_at')
         } for task in current_tasks]
         
-        return jsonify({
+        return with_etag(jsonify({
             "status": "success",
-            "message": "Tasks synced successfully",
-            "fileId": file_id,
+            **synced,
             "tasks": formatted_tasks
-        })
+        }), etag)
     except Exception as e:
         app.logger.error(f"Task sync failed: {str(e)}")
         return jsonify({"status": "error", "message": str(e)})
@@ -227,24 +618,41 @@ def sync_tasks():
 #=============================================================================
 # MAGIC SORT ROUTES
 #=============================================================================
+def run_magic_sort() -> Dict[str, Any]:
+    """Categorize and sort all tasks, then apply the new order
+    
+    Categorizes a snapshot of the list and applies the results by id,
+    so CRUD and syncs that land while OpenAI answers are kept.
+    """
+    snapshot = list(task_manager.tasks)
+    result = magic_sorter.process_tasks(snapshot)
+    if not result or not snapshot:
+        raise ValueError("No tasks to sort")
+    tasks = task_manager.apply_categorizations(result['categorizations'], MagicSort.sort_key)
+    return {"tasks": tasks, "stats": result.get('stats', {})}
+
+def run_magic_sort_job() -> Dict[str, Any]:
+    """Background variant; clients reload the sorted list from /tasks"""
+    result = run_magic_sort()
+    return {"message": "Tasks sorted successfully", "stats": result.get('stats', {})}
+
 @app.route("/magic-sort", methods=["POST"])
 @login_required
 def magic_sort():
-    """Sort tasks using Eisenhower Matrix"""
+    """Sort tasks using Eisenhower Matrix
+    
+    With "Prefer: respond-async" the sort runs as a background job and the
+    response is 202 with the job to poll at /jobs/<id>.
+    """
     try:
-        result = magic_sorter.process_tasks()
-        if result and result.get('tasks'):
-            # Update task manager with sorted tasks
-            task_manager.tasks = result['tasks']
-            task_manager.save_tasks()
-            return jsonify({
-                "status": "success",
-                "message": "Tasks sorted successfully",
-                "tasks": result['tasks']
-            })
+        if wants_async():
+            return submit_job('magic_sort', run_magic_sort_job)
+        result = run_magic_sort()
         return jsonify({
-            "status": "error",
-            "message": "No tasks to sort"
+            "status": "success",
+            "message": "Tasks sorted successfully",
+            "tasks": result['tasks'],
+            "stats": result.get('stats', {})
         })
     except Exception as e:
         app.logger.error(f"Magic sort failed: {str(e)}")
@@ -253,6 +661,15 @@ def magic_sort():
             "message": str(e)
         })
 
+@app.route("/magic-sort/metrics")
+@login_required
+def magic_sort_metrics():
+    """Expose cumulative Magic Sort LLM instrumentation as JSON"""
+    return jsonify({
+        "status": "success",
+        "metrics": registry.snapshot('magic_sort_')
+    })
+
 if __name__ == "__main__":
     app.run(
         host=Config.HOST,
@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+from metrics import registry, DEFAULT_BUCKETS, FAST_BUCKETS
+
+JOB_DURATION = registry.histogram(
+    'background_job_duration_seconds', 'Run time of background jobs',
+    labels=('job', 'outcome'), buckets=DEFAULT_BUCKETS)
+JOB_QUEUE_WAIT = registry.histogram(
+    'background_job_queue_wait_seconds', 'Time background jobs waited for a worker',
+    labels=('job',), buckets=FAST_BUCKETS)
+JOBS_REJECTED = registry.counter(
+    'background_jobs_rejected_total', 'Jobs refused because the queue was full',
+    labels=('job',))
+JOBS_ACTIVE = registry.gauge('background_jobs_active', 'Background jobs queued or running')
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already queued or running"""
+
+class JobRunner:
+    """Runs slow external calls on a bounded worker pool
+
+    Drive syncs and Magic Sort runs spend most of their time waiting on
+    Google and OpenAI. Running them here frees the request thread at once;
+    clients poll the job until it finishes. A user's second request for a
+    job that is still queued or running joins the existing job instead of
+    starting another, and once ``max_pending`` jobs are active new ones
+    are refused rather than queued without bound.
+    """
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 64, history: int = 200):
+        self._setup_logging()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.max_pending = max_pending
+        self.history = history
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._active: Dict[tuple, str] = {}  # (name, owner) -> id of the queued or running job
+        self._lock = threading.Lock()
+        JOBS_ACTIVE.set_function(lambda: len(self._active))
+
+    def _setup_logging(self) -> None:
+        """Configure logging"""
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger('JobRunner')
+
+    #=============================================================================
+    # Jobs
+    #=============================================================================
+    def submit(self, name: str, function: Callable[..., Any], *args: Any,
+               owner: Optional[str] = None, **kwargs: Any) -> Dict[str, Any]:
+        """Queue a job and return its public state
+
+        Raises:
+            JobQueueFull: If max_pending jobs are already queued or running
+        """
+        with self._lock:
+            existing = self._active.get((name, owner))
+            if existing is not None:
+                return self._public(self._jobs[existing])
+            if len(self._active) >= self.max_pending:
+                JOBS_REJECTED.inc(job=name)
+                raise JobQueueFull(f"Too many background jobs in progress ({self.max_pending})")
+
+            job = {
+                'id': uuid4().hex,
+                'name': name,
+                'owner': owner,
+                'status': 'queued',
+                'submitted_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None,
+                '_queued': time.perf_counter()
+            }
+            self._jobs[job['id']] = job
+            self._active[(name, owner)] = job['id']
+            self._prune()
+            snapshot = self._public(job)
+
+        self._executor.submit(self._run, job, function, args, kwargs)
+        self.logger.debug(f"Queued job {name} ({job['id']})")
+        return snapshot
+
+    def get(self, job_id: str, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Public state of a job, or None if unknown or owned by someone else"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['owner'] != owner:
+                return None
+            return self._public(job)
+
+    def _run(self, job: Dict[str, Any], function: Callable[..., Any],
+             args: tuple, kwargs: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        JOB_QUEUE_WAIT.observe(started - job['_queued'], job=job['name'])
+        with self._lock:
+            job['status'] = 'running'
+            job['started_at'] = datetime.now().isoformat()
+        try:
+            result = function(*args, **kwargs)
+            outcome = {'status': 'succeeded', 'result': result}
+        except Exception as e:
+            self.logger.error(f"Job {job['name']} ({job['id']}) failed: {str(e)}")
+            outcome = {'status': 'failed', 'error': str(e)}
+        JOB_DURATION.observe(time.perf_counter() - started, job=job['name'], outcome=outcome['status'])
+        with self._lock:
+            job.update(outcome, finished_at=datetime.now().isoformat())
+            self._active.pop((job['name'], job['owner']), None)
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the history limit; call under the lock"""
+        excess = len(self._jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job['status'] in ('succeeded', 'failed')][:excess]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in job.items()
+                if key != 'owner' and not key.startswith('_')}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs and optionally wait for running ones"""
+        self._executor.shutdown(wait=wait)
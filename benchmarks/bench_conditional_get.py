@@ -0,0 +1,100 @@
+"""Bytes and latency saved by ETag revalidation on unchanged task lists
+
+Reads ``/`` and ``/tasks`` repeatedly through the Flask test client, once
+unconditionally and once with ``If-None-Match``, and reports body bytes and
+per-request latency for both:
+
+    python -m benchmarks.bench_conditional_get --tasks 10000 --repeat 200
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.datasets import make_tasks, write_tasks_file
+from config import Config
+
+def time_reads(client, path: str, repeat: int, etag: Optional[str]) -> Dict[str, Any]:
+    """Issue repeated GETs and collect status, bytes and latency"""
+    headers = {'If-None-Match': etag} if etag else {}
+    latencies: List[float] = []
+    total_bytes = 0
+    statuses = set()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        body = response.get_data()
+        latencies.append(time.perf_counter() - started)
+        total_bytes += len(body)
+        statuses.add(response.status_code)
+    return {
+        'statuses': sorted(statuses),
+        'bytes_per_request': total_bytes // repeat,
+        'latency_ms_p50': round(statistics.median(latencies) * 1000, 4),
+        'latency_ms_mean': round(statistics.fmean(latencies) * 1000, 4)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(prefix='etag_bench_', suffix='.json')
+    os.close(fd)
+    try:
+        write_tasks_file(path, make_tasks(args.tasks))
+        # Point the app at the synthetic dataset before it is imported, and
+        # keep every task in the list being measured
+        Config.DATA_PATH = path
+        Config.ARCHIVE_AFTER_DAYS = 0
+        import app as app_module
+        app_module.task_manager.logger.disabled = True
+
+        client = app_module.app.test_client()
+        with client.session_transaction() as session:
+            session['isAuth'] = True
+            session['user'] = {'email': 'bench@example.com', 'name': 'Bench'}
+
+        results = {}
+        for route in ('/', '/tasks?limit=500'):
+            first = client.get(route)
+            etag = first.headers.get('ETag')
+            full = time_reads(client, route, args.repeat, None)
+            revalidated = time_reads(client, route, args.repeat, etag)
+            if revalidated['statuses'] != [304]:
+                raise SystemExit(f"{route}: expected only 304 responses, got {revalidated['statuses']}")
+            results[route] = {
+                'etag': etag,
+                'full': full,
+                'revalidated': revalidated,
+                'bytes_saved_per_request': full['bytes_per_request'] - revalidated['bytes_per_request'],
+                'latency_ms_saved_p50': round(full['latency_ms_p50'] - revalidated['latency_ms_p50'], 4)
+            }
+            print(f"{route:<18} full {full['bytes_per_request']:>9} B {full['latency_ms_p50']:>8.3f} ms   "
+                  f"304 {revalidated['bytes_per_request']:>3} B {revalidated['latency_ms_p50']:>8.3f} ms",
+                  file=sys.stderr)
+    finally:
+        os.remove(path)
+
+    report = {
+        'benchmark': 'conditional_get',
+        'python': platform.python_version(),
+        'config': vars(args),
+        'routes': results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""HTTP load test for the CRUD, listing and sync endpoints
+
+Serves the real Flask app on a local port with a synthetic tasks file, an
+authenticated test session, an in-memory Drive stand-in and the mock OpenAI
+server, then drives each endpoint concurrently and reports throughput and
+p50/p95/p99 latency as JSON that can be diffed between versions:
+
+    python -m benchmarks.bench_http --sizes 1000 10000 100000 --concurrency 8
+    python -m benchmarks.bench_http --sizes 1000000 --requests 50 --scenarios index list update
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from werkzeug.serving import BaseWSGIServer, make_server
+
+from benchmarks.datasets import make_tasks, write_tasks_file
+from benchmarks.local_drive import LocalDrive
+from benchmarks.mock_openai import MockOpenAIServer
+from config import Config
+
+SCENARIOS = ('index', 'list', 'add', 'update', 'delete', 'sync', 'mixed')
+
+# A request is (method, path, form body)
+Request = Tuple[str, str, Optional[Dict[str, str]]]
+
+#=============================================================================
+# Harness
+#=============================================================================
+class PooledWSGIServer(BaseWSGIServer):
+    """Serves requests on a fixed number of threads
+
+    Models a production deployment with a bounded worker count: once every
+    thread is busy, further requests wait. Connections close after each
+    response (HTTP/1.0), so a thread is only held for one request.
+    """
+
+    def __init__(self, host: str, port: int, app: Any, workers: int):
+        super().__init__(host, port, app)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http')
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+class AppUnderTest:
+    """Runs the Flask app in-process against a given dataset
+
+    ``workers`` bounds the request threads; by default every request gets
+    its own thread.
+    """
+
+    def __init__(self, app_module: Any, drive_latency: float, openai_url: str,
+                 workers: Optional[int] = None):
+        self.app_module = app_module
+        self.drive = LocalDrive(latency=drive_latency)
+        self.openai_url = openai_url
+        if workers:
+            self.server = PooledWSGIServer('127.0.0.1', 0, app_module.app, workers)
+        else:
+            self.server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+        self.port = self.server.server_port
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.cookie = self.session_cookie()
+
+    def session_cookie(self, email: str = 'bench@example.com') -> str:
+        """Create an authenticated session through the app's own session interface"""
+        app = self.app_module.app
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['isAuth'] = True
+            session['user'] = {'email': email, 'name': 'Bench'}
+            session['credentials'] = json.dumps({'token': 'local'})
+        cookie = client.get_cookie(app.config['SESSION_COOKIE_NAME'])
+        return f"{cookie.key}={cookie.value}"
+
+    def load_dataset(self, path: str) -> None:
+        """Point the app's services at a fresh tasks file and stand-ins"""
+        from openai import OpenAI
+        from change_feed import ChangeFeed
+        from magic_sort import MagicSort
+        from task_manager import TaskManager
+
+        module = self.app_module
+        module.task_manager = TaskManager(path)
+        module.change_feed = ChangeFeed(module.task_manager.epoch, module.task_manager.revision,
+                                        Config.CHANGE_FEED_HISTORY)
+        module.task_manager.add_listener(module.change_feed.publish)
+        module.magic_sorter = MagicSort(client=OpenAI(api_key='mock', base_url=self.openai_url))
+        module.google_auth = self.drive
+        with open(path, 'r', encoding='utf-8') as f:
+            self.drive.seed(json.load(f))
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        if isinstance(self.server, PooledWSGIServer):
+            self.server.pool.shutdown(wait=False)
+
+def percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of a sorted list, in milliseconds"""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return round(ordered[index] * 1000, 3)
+
+def run_scenario(target: AppUnderTest, requests: List[Request], concurrency: int) -> Dict[str, Any]:
+    """Issue requests over keep-alive connections from a worker pool"""
+    local = threading.local()
+    headers = {'Cookie': target.cookie, 'Content-Type': 'application/x-www-form-urlencoded'}
+
+    def issue(request: Request) -> Tuple[float, int]:
+        if not hasattr(local, 'connection'):
+            local.connection = http.client.HTTPConnection('127.0.0.1', target.port, timeout=300)
+        method, path, form = request
+        body = urlencode(form) if form is not None else None
+        started = time.perf_counter()
+        try:
+            local.connection.request(method, path, body=body, headers=headers)
+            response = local.connection.getresponse()
+            payload = response.read()
+            status = response.status
+            # The app reports failures as {"status": "error"} with HTTP 200
+            if status == 200 and len(payload) < 4096 and payload.startswith(b'{'):
+                if json.loads(payload).get('status') == 'error':
+                    status = 599
+        except (http.client.HTTPException, OSError):
+            local.connection.close()
+            del local.connection
+            status = 0
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(issue, requests))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, status in results if not 200 <= status < 400)
+    return {
+        'requests': len(requests),
+        'errors': errors,
+        'wall_seconds': round(elapsed, 4),
+        'throughput_rps': round(len(requests) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'max': round(latencies[-1] * 1000, 3) if latencies else None
+        }
+    }
+
+#=============================================================================
+# Scenarios
+#=============================================================================
+def build_requests(scenario: str, count: int, task_ids: List[str],
+                   rng: random.Random) -> List[Request]:
+    """Build the request list for a scenario; delete consumes task_ids"""
+    builders: Dict[str, Callable[[int], Request]] = {
+        'index': lambda i: ('GET', '/', None),
+        'list': lambda i: ('GET', f"/tasks?limit={Config.TASK_PAGE_SIZE}", None),
+        'add': lambda i: ('POST', '/add-task', {'task': f"Benchmark task {i}"}),
+        'update': lambda i: ('POST', '/update-task', {
+            'id': rng.choice(task_ids), 'content': f"Updated {i}", 'completed': 'true'}),
+        'sync': lambda i: ('POST', '/sync-tasks', {}),
+    }
+    if scenario == 'delete':
+        victims = task_ids[-count:]
+        del task_ids[-count:]
+        return [('POST', '/delete-task', {'id': task_id}) for task_id in victims]
+    if scenario == 'mixed':
+        weights = [('index', 2), ('list', 4), ('add', 2), ('update', 2)]
+        names = [name for name, weight in weights for _ in range(weight)]
+        return [builders[rng.choice(names)](i) for i in range(count)]
+    return [builders[scenario](i) for i in range(count)]
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Dataset sizes in tasks (up to 1000000)')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--drive-latency', type=float, default=0.0,
+                        help='Seconds slept per Drive stand-in call')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    # Keep per-request logging out of the measurements
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    workdir = tempfile.mkdtemp(prefix='http_bench_')
+    placeholder = os.path.join(workdir, 'placeholder.json')
+    write_tasks_file(placeholder, [])
+    Config.DATA_PATH = placeholder
+    import app as app_module
+
+    results = []
+    with MockOpenAIServer() as openai_server:
+        target = AppUnderTest(app_module, args.drive_latency, openai_server.base_url)
+        try:
+            for size in args.sizes:
+                path = os.path.join(workdir, f"tasks_{size}.json")
+                tasks = make_tasks(size, categorized=True, seed=args.seed)
+                write_tasks_file(path, tasks)
+                task_ids = [task['id'] for task in tasks]
+                del tasks
+                target.load_dataset(path)
+                target.app_module.task_manager.logger.disabled = True
+
+                rng = random.Random(args.seed)
+                size_result = {'tasks': size, 'file_bytes': os.path.getsize(path), 'scenarios': {}}
+                for scenario in args.scenarios:
+                    requests = build_requests(scenario, args.requests, task_ids, rng)
+                    stats = run_scenario(target, requests, args.concurrency)
+                    size_result['scenarios'][scenario] = stats
+                    print(f"{size:>8} tasks  {scenario:<7} {stats['throughput_rps']:>9} req/s  "
+                          f"p50 {stats['latency_ms']['p50']:>9} ms  p95 {stats['latency_ms']['p95']:>9} ms  "
+                          f"p99 {stats['latency_ms']['p99']:>9} ms  errors {stats['errors']}",
+                          file=sys.stderr)
+                results.append(size_result)
+                os.remove(path)
+        finally:
+            target.stop()
+    os.remove(placeholder)
+    os.rmdir(workdir)
+
+    report = {
+        'benchmark': 'http',
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'results': results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
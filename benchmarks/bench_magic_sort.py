@@ -0,0 +1,81 @@
+"""Magic Sort throughput benchmark against the local OpenAI stand-in
+
+Measures ``MagicSort.process_tasks`` wall time, completion calls issued and
+tasks per second for several dataset sizes:
+
+    python -m benchmarks.bench_magic_sort
+    python -m benchmarks.bench_magic_sort --sizes 10 1000 --latency 0.05 --output results.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any, Dict
+
+from openai import OpenAI
+
+from benchmarks.datasets import make_tasks
+from benchmarks.mock_openai import MockOpenAIServer
+from magic_sort import MagicSort
+
+def run_size(server: MockOpenAIServer, client: OpenAI, size: int) -> Dict[str, Any]:
+    """Sort a fresh dataset of the given size and collect timings"""
+    tasks = make_tasks(size)
+    sorter = MagicSort(client=client)
+    server.reset_stats()
+    started = time.perf_counter()
+    result = sorter.process_tasks(tasks)
+    elapsed = time.perf_counter() - started
+
+    stats = (result or {}).get('stats', {})
+    return {
+        'tasks': size,
+        'wall_seconds': round(elapsed, 4),
+        'tasks_per_second': round(size / elapsed, 2) if elapsed else None,
+        'calls_issued': server.stats['requests'],
+        'calls_ok': server.stats['ok'],
+        'calls_rate_limited': server.stats['rate_limited'],
+        'calls_failed': server.stats['errors'],
+        'fallbacks': stats.get('fallbacks', {}),
+        'latency_seconds': stats.get('latency_seconds', {})
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--latency', type=float, default=0.0, help='Mock response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--max-retries', type=int, default=2, help='OpenAI client retries')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    with MockOpenAIServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                          rate_limit_rate=args.rate_limit_rate, seed=args.seed) as server:
+        client = OpenAI(api_key='mock', base_url=server.base_url, max_retries=args.max_retries)
+        runs = []
+        for size in args.sizes:
+            run = run_size(server, client, size)
+            runs.append(run)
+            print(f"{size:>7} tasks  {run['wall_seconds']:>9.3f}s  "
+                  f"{run['calls_issued']:>7} calls  {run['tasks_per_second']} tasks/s",
+                  file=sys.stderr)
+
+    report = {
+        'benchmark': 'magic_sort.process_tasks',
+        'python': platform.python_version(),
+        'config': vars(args),
+        'runs': runs
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""CRUD latency while slow Drive syncs are in flight, inline vs background jobs
+
+Serves the app on a fixed number of request threads, the way a production
+deployment has a fixed worker count. Some clients sync repeatedly against a
+Drive stand-in that sleeps per call while others issue CRUD requests. The
+run is repeated with syncs handled inline (each holds a request thread for
+the whole Drive round trip) and as background jobs (``Prefer:
+respond-async`` plus polling ``/jobs/<id>``):
+
+    python -m benchmarks.bench_offload --workers 4 --sync-clients 8 --drive-latency 0.3
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from benchmarks.bench_http import AppUnderTest, git_revision, percentile
+from benchmarks.datasets import make_tasks, write_tasks_file
+from benchmarks.mock_openai import MockOpenAIServer
+from config import Config
+
+MODES = ('inline', 'async')
+
+class Client:
+    """One simulated browser: its own session and connection"""
+
+    def __init__(self, port: int, cookie: str):
+        self.port = port
+        self.cookie = cookie
+
+    def request(self, method: str, path: str, form: Optional[Dict[str, str]] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        # The pooled server closes every connection, so open one per request
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=300)
+        try:
+            all_headers = {'Cookie': self.cookie, 'Content-Type': 'application/x-www-form-urlencoded'}
+            all_headers.update(headers or {})
+            body = urlencode(form) if form is not None else None
+            connection.request(method, path, body=body, headers=all_headers)
+            response = connection.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        finally:
+            connection.close()
+
+def sync_once(client: Client, mode: str, poll_interval: float) -> bool:
+    """Run one sync to completion; True if it succeeded"""
+    if mode == 'inline':
+        status, _, body = client.request('POST', '/sync-tasks', {})
+        return status == 200 and json.loads(body).get('status') == 'success'
+
+    status, headers, body = client.request('POST', '/sync-tasks', {}, {'Prefer': 'respond-async'})
+    if status != 202:
+        return False
+    location = headers.get('Location') or f"/jobs/{json.loads(body)['job']['id']}"
+    while True:
+        time.sleep(poll_interval)
+        status, _, body = client.request('GET', location)
+        if status != 200:
+            return False
+        job = json.loads(body)['job']
+        if job['status'] in ('succeeded', 'failed'):
+            return job['status'] == 'succeeded'
+
+def run_mode(target: AppUnderTest, mode: str, args: argparse.Namespace,
+             task_ids: List[str]) -> Dict[str, Any]:
+    """Run sync and CRUD clients side by side for args.duration seconds"""
+    deadline = time.perf_counter() + args.duration
+    crud_latencies: List[float] = []
+    sync_latencies: List[float] = []
+    errors = {'crud': 0, 'sync': 0}
+    lock = threading.Lock()
+
+    def sync_loop(n: int) -> None:
+        client = Client(target.port, target.session_cookie(f"sync-{n}@example.com"))
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            ok = sync_once(client, mode, args.poll_interval)
+            with lock:
+                sync_latencies.append(time.perf_counter() - started)
+                errors['sync'] += not ok
+
+    def crud_loop(n: int) -> None:
+        client = Client(target.port, target.session_cookie(f"crud-{n}@example.com"))
+        rng = random.Random(args.seed + n)
+        while time.perf_counter() < deadline:
+            if rng.random() < 0.5:
+                request = ('GET', f"/tasks?limit={Config.TASK_PAGE_SIZE}", None)
+            else:
+                request = ('POST', '/update-task', {'id': rng.choice(task_ids), 'completed': 'true'})
+            started = time.perf_counter()
+            status, _, _ = client.request(*request)
+            with lock:
+                crud_latencies.append(time.perf_counter() - started)
+                errors['crud'] += status != 200
+
+    threads = ([threading.Thread(target=sync_loop, args=(n,)) for n in range(args.sync_clients)] +
+               [threading.Thread(target=crud_loop, args=(n,)) for n in range(args.crud_clients)])
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    crud_latencies.sort()
+    sync_latencies.sort()
+    return {
+        'wall_seconds': round(elapsed, 3),
+        'crud': {
+            'requests': len(crud_latencies),
+            'errors': errors['crud'],
+            'throughput_rps': round(len(crud_latencies) / elapsed, 2),
+            'latency_ms': {
+                'p50': percentile(crud_latencies, 0.50),
+                'p95': percentile(crud_latencies, 0.95),
+                'p99': percentile(crud_latencies, 0.99)
+            }
+        },
+        'sync': {
+            'completed': len(sync_latencies),
+            'errors': errors['sync'],
+            'latency_ms': {
+                'p50': percentile(sync_latencies, 0.50),
+                'p95': percentile(sync_latencies, 0.95)
+            }
+        },
+        'drive_calls': target.drive.calls
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4, help='Request threads serving the app')
+    parser.add_argument('--sync-clients', type=int, default=8)
+    parser.add_argument('--crud-clients', type=int, default=4)
+    parser.add_argument('--drive-latency', type=float, default=0.3,
+                        help='Seconds slept per Drive stand-in call (a sync makes three)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per mode')
+    parser.add_argument('--poll-interval', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    workdir = tempfile.mkdtemp(prefix='offload_bench_')
+    path = os.path.join(workdir, 'tasks.json')
+    write_tasks_file(path, [])
+    Config.DATA_PATH = path
+    import app as app_module
+
+    results = {}
+    with MockOpenAIServer() as openai_server:
+        target = AppUnderTest(app_module, args.drive_latency, openai_server.base_url,
+                              workers=args.workers)
+        try:
+            for mode in args.modes:
+                tasks = make_tasks(args.tasks, categorized=True, seed=args.seed)
+                write_tasks_file(path, tasks)
+                target.load_dataset(path)
+                target.drive.calls = 0
+                target.app_module.task_manager.logger.disabled = True
+
+                result = run_mode(target, mode, args, [task['id'] for task in tasks])
+                results[mode] = result
+                crud, sync = result['crud'], result['sync']
+                print(f"{mode:<7} CRUD {crud['throughput_rps']:>8} req/s  "
+                      f"p50 {crud['latency_ms']['p50']:>9} ms  p99 {crud['latency_ms']['p99']:>9} ms  |  "
+                      f"syncs {sync['completed']:>4}  p50 {sync['latency_ms']['p50']} ms  "
+                      f"errors {crud['errors'] + sync['errors']}", file=sys.stderr)
+        finally:
+            target.stop()
+    os.remove(path)
+    os.rmdir(workdir)
+
+    report = {
+        'benchmark': 'offload',
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'config': vars(args),
+        'results': results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Query latency of the full-text search index
+
+Indexes synthetic task content and times a fixed set of queries against
+SearchIndex directly: common and rare words, short prefixes and
+multi-word queries. Two vocabularies are measured, a small one where
+every word is common and a larger Zipf-distributed one:
+
+    python -m benchmarks.bench_search --tasks 100000 --repeat 200
+"""
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+from search_index import SearchIndex
+
+COMMON_WORDS = [
+    'buy', 'milk', 'call', 'mom', 'book', 'flight', 'pay', 'rent', 'read', 'report',
+    'plan', 'trip', 'fix', 'bike', 'clean', 'kitchen', 'email', 'boss', 'review', 'budget',
+    'walk', 'dog', 'water', 'plants', 'renew', 'passport', 'pick', 'up', 'prepare', 'slides'
+]
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'te', 'vi', 'do', 'pa', 'zu', 'ber', 'gor', 'lin']
+
+def make_vocabulary(size: int) -> List[str]:
+    """The common words followed by synthetic ones, most frequent first"""
+    words = list(COMMON_WORDS[:size])
+    for n in itertools.count(2):
+        for parts in itertools.product(SYLLABLES, repeat=n):
+            if len(words) >= size:
+                return words
+            words.append(''.join(parts))
+    return words
+
+def make_contents(count: int, vocabulary: List[str], zipf: float, seed: int) -> List[str]:
+    """Task contents of 2-8 words; zipf 0 draws words uniformly"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** zipf for rank in range(len(vocabulary))]
+    return [' '.join(rng.choices(vocabulary, weights, k=rng.randint(2, 8))) for _ in range(count)]
+
+def time_query(index: SearchIndex, query: str, repeat: int, limit: int) -> Dict[str, Any]:
+    """Run one query repeatedly and collect latency"""
+    latencies: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = index.search(query, limit=limit)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        'results': len(results),
+        'latency_ms_p50': round(statistics.median(latencies) * 1000, 4),
+        'latency_ms_p99': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 4),
+        'latency_ms_max': round(latencies[-1] * 1000, 4)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    datasets = {
+        'common_30': (make_vocabulary(30), 0.0, [
+            'buy', 'milk', 'b', 'p', 'buy milk', 'buy m', 'book flight p', 'call mom r',
+            'pay rent read report', 'walk dog water plants r'
+        ]),
+        'zipf_5000': (make_vocabulary(5000), 1.0, [
+            'buy', 'slides', 'kalo', 'b', 'ka', 'buy milk', 'buy m', 'book flight p',
+            'call mom r', 'buy kalomi', 'kalo mine'
+        ])
+    }
+    results = {}
+    for name, (vocabulary, zipf, queries) in datasets.items():
+        contents = make_contents(args.tasks, vocabulary, zipf, seed=1)
+        started = time.perf_counter()
+        index = SearchIndex()
+        index.rebuild([{'id': str(i), 'content': content} for i, content in enumerate(contents)])
+        build_seconds = time.perf_counter() - started
+
+        timings = {query: time_query(index, query, args.repeat, args.limit) for query in queries}
+        results[name] = {'build_seconds': round(build_seconds, 3), 'queries': timings}
+        print(f"{name}: built in {build_seconds:.2f} s", file=sys.stderr)
+        for query, timing in timings.items():
+            print(f"  {query!r:<28} {timing['results']:>3} hits  p50 {timing['latency_ms_p50']:>8.4f} ms  "
+                  f"p99 {timing['latency_ms_p99']:>8.4f} ms  max {timing['latency_ms_max']:>8.4f} ms",
+                  file=sys.stderr)
+
+    report = {
+        'benchmark': 'search',
+        'python': platform.python_version(),
+        'config': vars(args),
+        'datasets': results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Synthetic task datasets shared by the benchmarks"""
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+QUADRANTS = ['', 'Q1', 'Q2', 'Q3', 'Q4']
+
+def make_tasks(count: int, categorized: bool = False, seed: Optional[int] = 1) -> List[Dict[str, Any]]:
+    """Build synthetic tasks in the tasks.json format
+
+    Args:
+        count: Number of tasks
+        categorized: Give tasks a quadrant, urgency and importance as if
+            Magic Sort had already run; otherwise leave them unsorted
+        seed: Seed for reproducible datasets
+    """
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=365)
+    tasks = []
+    for i in range(count):
+        created = start + timedelta(seconds=rng.randint(0, 365 * 86400))
+        task = {
+            'id': str(uuid4()),
+            'content': f"Synthetic task {i}: prepare report section {i % 97}",
+            'completed': rng.random() < 0.3,
+            'created_at': created.isoformat(),
+            'updated_at': (created + timedelta(seconds=rng.randint(0, 86400))).isoformat(),
+            'quadrant': ''
+        }
+        if categorized:
+            task['quadrant'] = rng.choice(QUADRANTS[1:])
+            task['urgency'] = rng.randint(1, 5)
+            task['importance'] = rng.randint(1, 5)
+        tasks.append(task)
+    return tasks
+
+def write_tasks_file(path: str, tasks: List[Dict[str, Any]]) -> None:
+    """Write tasks to path in the TaskManager file format"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'tasks': tasks, 'last_sync': None}, f)
@@ -0,0 +1,77 @@
+"""In-memory stand-in for the Google Drive side of GoogleAuth"""
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from config import Config
+
+class LocalDrive:
+    """Implements the GoogleAuth Drive methods used by the sync route
+
+    Files live in memory; ``latency`` seconds are slept per call to imitate
+    network round trips.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _round_trip(self) -> None:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def seed(self, data: Dict[str, Any], file_name: str = Config.BACKUP_FILENAME) -> None:
+        """Store an initial cloud copy without counting a call"""
+        with self._lock:
+            self.files[file_name] = {
+                'id': f"local-{file_name}",
+                'name': file_name,
+                'content': json.dumps(data).encode('utf-8'),
+                'modifiedTime': datetime.now(timezone.utc).isoformat()
+            }
+
+    def credentials_for(self, session_id: str, credentials_json: str) -> Any:
+        return credentials_json
+
+    def forget_credentials(self, session_id: str) -> None:
+        pass
+
+    def get_drive_file_metadata(self, credentials_json: Any,
+                                file_name: str = Config.BACKUP_FILENAME) -> Optional[Dict[str, Any]]:
+        self._round_trip()
+        stored = self.files.get(file_name)
+        if stored is None:
+            return None
+        return {'id': stored['id'], 'name': stored['name'], 'modifiedTime': stored['modifiedTime']}
+
+    def download_file(self, credentials_json: Any, file_id: str) -> bytes:
+        self._round_trip()
+        for stored in self.files.values():
+            if stored['id'] == file_id:
+                return stored['content']
+        raise FileNotFoundError(file_id)
+
+    def download_from_drive(self, credentials_json: Any, file_id: str) -> Dict[str, Any]:
+        return json.loads(self.download_file(credentials_json, file_id))
+
+    def upload_to_drive(self, credentials_json: Any, file_path: str,
+                        mime_type: str = Config.MIME_TYPE,
+                        file_name: str = Config.BACKUP_FILENAME) -> str:
+        return self.upload_file(credentials_json, file_path, mime_type, file_name)['id']
+
+    def upload_file(self, credentials_json: Any, file_path: str,
+                    mime_type: str = Config.MIME_TYPE,
+                    file_name: str = Config.BACKUP_FILENAME) -> Dict[str, Any]:
+        self._round_trip()
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        with self._lock:
+            self.files[file_name] = {'id': f"local-{file_name}", 'name': file_name, 'content': content,
+                                     'modifiedTime': datetime.now(timezone.utc).isoformat()}
+            return {'id': self.files[file_name]['id'], 'modifiedTime': self.files[file_name]['modifiedTime']}
@@ -0,0 +1,187 @@
+"""Local stand-in for the OpenAI chat-completions API
+
+Speaks just enough of ``POST /v1/chat/completions`` for the OpenAI SDK to
+parse responses, with configurable latency, error and 429 rates and canned
+JSON answers. Used by the benchmarks and for offline development:
+
+    python -m benchmarks.mock_openai --port 8090 --latency 0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8090/v1 python app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+DEFAULT_ANSWERS = [
+    '{"urgency": 5, "importance": 5, "quadrant": "Q1"}',
+    '{"urgency": 2, "importance": 4, "quadrant": "Q2"}',
+    '{"urgency": 4, "importance": 2, "quadrant": "Q3"}',
+    '{"urgency": 1, "importance": 1, "quadrant": "Q4"}',
+]
+
+class MockOpenAIServer:
+    """Threaded HTTP server imitating the chat-completions endpoint"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 answers: Optional[List[str]] = None, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.answers = answers or DEFAULT_ANSWERS
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats[key] += 1
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def _answer(self) -> str:
+        with self._lock:
+            return self._random.choice(self.answers)
+
+    def _delay(self) -> float:
+        if not self.latency and not self.jitter:
+            return 0.0
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._send(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+                    return
+
+                delay = server._delay()
+                if delay:
+                    time.sleep(delay)
+
+                draw = server._draw()
+                if draw < server.rate_limit_rate:
+                    server._count('rate_limited')
+                    self._send(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}},
+                               {'retry-after-ms': '10'})
+                    return
+                if draw < server.rate_limit_rate + server.error_rate:
+                    server._count('errors')
+                    self._send(500, {'error': {'message': 'Mock server error', 'type': 'server_error'}})
+                    return
+
+                prompt = ''.join(str(m.get('content', '')) for m in request.get('messages', []))
+                answer = server._answer()
+                server._count('ok')
+                self._send(200, {
+                    'id': f"chatcmpl-{uuid4().hex}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'mock'),
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': answer},
+                        'finish_reason': 'stop'
+                    }],
+                    'usage': {
+                        # Rough token estimate: four characters per token
+                        'prompt_tokens': len(prompt) // 4,
+                        'completion_tokens': len(answer) // 4,
+                        'total_tokens': (len(prompt) + len(answer)) // 4
+                    }
+                })
+
+        return Handler
+
+    def start(self) -> 'MockOpenAIServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockOpenAIServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- delay jitter in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of 500 responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of 429 responses')
+    parser.add_argument('--answers', help='JSON file holding a list of canned completion strings')
+    args = parser.parse_args()
+
+    answers = None
+    if args.answers:
+        with open(args.answers, 'r', encoding='utf-8') as f:
+            answers = json.load(f)
+
+    server = MockOpenAIServer(args.host, args.port, args.latency, args.jitter,
+                              args.error_rate, args.rate_limit_rate, answers)
+    print(f"Mock OpenAI server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+class ChangeFeed:
+    """Bounded in-memory log of task deltas for server-sent events
+
+    TaskManager publishes every mutation here tagged with its revision.
+    Clients resume from the last revision they saw; if that revision has
+    already fallen out of the retained history (or belongs to another
+    process), they receive a single ``reset`` event and refetch instead.
+    """
+
+    def __init__(self, epoch: str, revision: int = 0, history: int = 1000):
+        self.epoch = epoch
+        self._events: deque = deque(maxlen=history)
+        self._floor = revision  # Oldest revision a client can resume from
+        self._latest = revision
+        self._condition = threading.Condition()
+
+    @property
+    def latest(self) -> int:
+        return self._latest
+
+    def publish(self, revision: int, changes: List[Dict[str, Any]]) -> None:
+        """Append the deltas of one revision and wake waiting streams"""
+        with self._condition:
+            for change in changes:
+                if len(self._events) == self._events.maxlen:
+                    self._floor = self._events[0]['revision']
+                self._events.append({'revision': revision, **change})
+            self._latest = max(self._latest, revision)
+            self._condition.notify_all()
+
+    def parse_token(self, token: Optional[str]) -> Optional[int]:
+        """Parse an ``epoch-revision`` token; None if it is unusable here"""
+        if not token:
+            return None
+        epoch, _, revision = token.rpartition('-')
+        if epoch != self.epoch or not revision.isdigit():
+            return None
+        return int(revision)
+
+    def token(self, revision: int) -> str:
+        return f"{self.epoch}-{revision}"
+
+    def _since(self, revision: int) -> Optional[List[Dict[str, Any]]]:
+        if revision < self._floor or revision > self._latest:
+            return None
+        return [event for event in self._events if event['revision'] > revision]
+
+    def wait(self, revision: int, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """Block until there are events after ``revision`` or the timeout passes
+
+        Returns:
+            The pending events (empty on timeout), or None if the client
+            cannot resume from ``revision`` and must reset.
+        """
+        with self._condition:
+            events = self._since(revision)
+            if events == []:
+                self._condition.wait(timeout)
+                events = self._since(revision)
+            return events
+
+    #=============================================================================
+    # Server-Sent Events
+    #=============================================================================
+    def _format(self, event: Dict[str, Any]) -> str:
+        return f"id: {self.token(event['revision'])}\ndata: {json.dumps(event)}\n\n"
+
+    def stream(self, since: Optional[int], heartbeat: float,
+               max_heartbeats: Optional[int] = None) -> Iterator[str]:
+        """Yield SSE frames from ``since`` onwards
+
+        Each open stream holds a request thread, so with ``max_heartbeats``
+        the stream ends after that many heartbeat intervals. EventSource
+        reconnects on its own and resumes from the last id it received.
+
+        Args:
+            since: Last revision the client holds, or None to start now
+            heartbeat: Seconds between keep-alive comments on an idle feed
+            max_heartbeats: Intervals before closing, or None to never close
+        """
+        last = self._latest if since is None else since
+        deadline = time.monotonic() + heartbeat * max_heartbeats if max_heartbeats else None
+        # Tell the client how long to wait before reconnecting
+        yield "retry: 3000\n\n"
+        while True:
+            timeout = heartbeat
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    # An id with no data sets where the client resumes from
+                    yield f"id: {self.token(last)}\n\n"
+                    return
+            events = self.wait(last, timeout)
+            if events is None:
+                last = self._latest
+                yield self._format({'revision': last, 'op': 'reset'})
+            elif not events:
+                yield ": heartbeat\n\n"
+            else:
+                for event in events:
+                    yield self._format(event)
+                last = events[-1]['revision']
@@ -19,6 +19,7 @@ class Config:
     # File settings
     BACKUP_FILENAME = os.getenv('BACKUP_FILENAME', 'tasks_backup.json')
     DATA_FILE = os.getenv('DATA_FILE', 'tasks.json')
+    DATA_PATH = os.path.join(BASE_DIR, DATA_FILE)  # Relative paths resolve against BASE_DIR
     MIME_TYPE = os.getenv('MIME_TYPE', 'application/json')
     
     # Application settings
@@ -27,15 +28,70 @@ class Config:
     HOST = os.getenv('HOST', '0.0.0.0')
     PORT = int(os.getenv('PORT', 8080))
     
+    # Task listing
+    TASK_PAGE_SIZE = int(os.getenv('TASK_PAGE_SIZE', 50))
+    TASK_PAGE_SIZE_MAX = int(os.getenv('TASK_PAGE_SIZE_MAX', 500))
+
+    # Task search
+    SEARCH_LIMIT = int(os.getenv('SEARCH_LIMIT', 20))
+    SEARCH_LIMIT_MAX = int(os.getenv('SEARCH_LIMIT_MAX', 100))
+    
+    # Task archive: completed tasks not updated for this many days move to
+    # an NDJSON file loaded only on demand. Off (0) by default, since the
+    # archive is only reachable through the /tasks/archived API
+    ARCHIVE_AFTER_DAYS = float(os.getenv('ARCHIVE_AFTER_DAYS', 0))
+    # Defaults to <data file>_archive.ndjson; relative paths resolve against BASE_DIR
+    ARCHIVE_PATH = os.path.join(BASE_DIR, os.getenv('ARCHIVE_PATH')) if os.getenv('ARCHIVE_PATH') else None
+    ARCHIVE_BACKUP_FILENAME = os.getenv('ARCHIVE_BACKUP_FILENAME', 'tasks_archive_backup.ndjson')
+    
+    # Bulk NDJSON import: tasks applied and saved per chunk
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 5000))
+    
+    # Change feed (server-sent events)
+    CHANGE_FEED_HISTORY = int(os.getenv('CHANGE_FEED_HISTORY', 1000))
+    CHANGE_FEED_HEARTBEAT = float(os.getenv('CHANGE_FEED_HEARTBEAT', 15))
+    # Each open stream holds a request thread; close it after this many
+    # heartbeats and let EventSource reconnect (0 keeps streams open)
+    CHANGE_FEED_MAX_HEARTBEATS = int(os.getenv('CHANGE_FEED_MAX_HEARTBEATS', 4))
+    
+    # Background jobs: Drive sync and Magic Sort run off the request thread
+    # for clients that send "Prefer: respond-async"
+    ASYNC_JOBS_ENABLED = os.getenv('ASYNC_JOBS_ENABLED', 'True').lower() == 'true'
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 8))
+    JOB_QUEUE_MAX = int(os.getenv('JOB_QUEUE_MAX', 64))
+    JOB_HISTORY = int(os.getenv('JOB_HISTORY', 200))
+    # Concurrent OpenAI requests per Magic Sort run
+    MAGIC_SORT_CONCURRENCY = int(os.getenv('MAGIC_SORT_CONCURRENCY', 4))
+    
     # Google OAuth Configuration
     GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET')
     
+    # Server-side sessions: the cookie holds only an opaque id.
+    # memory (per process), sqlite or file (shared by worker processes)
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory')
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH', os.path.join(BASE_DIR, 'sessions.db'))
+    SESSION_FILE_DIR = os.getenv('SESSION_FILE_DIR', os.path.join(BASE_DIR, 'sessions'))
+    SESSION_LIFETIME = int(os.getenv('SESSION_LIFETIME', 7 * 24 * 3600))
+    # Parsed Google credentials kept in memory, one per active session
+    CREDENTIALS_CACHE_SIZE = int(os.getenv('CREDENTIALS_CACHE_SIZE', 1024))
+    
     # Development settings
     OAUTHLIB_INSECURE_TRANSPORT = os.getenv('OAUTHLIB_INSECURE_TRANSPORT', '1' if os.getenv('FLASK_ENV') != 'production' else '0')
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     
+    # Request profiling: profile requests sent with "X-Profile-Token: <PROFILE_TOKEN>"
+    # and/or a random sample of all requests
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'absinthe_profiles'))
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')
+    
+    # Metrics: when set, /metrics requires "Authorization: Bearer <token>"
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None  # e.g. a local mock server
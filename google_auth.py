@@ -1,15 +1,61 @@
 import os
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Any
+from typing import Callable, Dict, Optional, Tuple, Any, Union
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
-import google.oauth2.credentials
 import googleapiclient.discovery
 import googleapiclient.http
 from config import Config  # Only import the Config class
+from metrics import registry
+
+GOOGLE_CALL_DURATION = registry.histogram(
+    'google_api_call_duration_seconds', 'Duration of Google OAuth and Drive calls',
+    labels=('operation', 'outcome'))
+
+def _timed(operation: str) -> Callable:
+    """Record the duration and outcome of a Google API call"""
+    def decorator(f: Callable) -> Callable:
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = f(*args, **kwargs)
+                outcome = 'success'
+                return result
+            finally:
+                GOOGLE_CALL_DURATION.observe(time.perf_counter() - started,
+                                             operation=operation, outcome=outcome)
+        return wrapper
+    return decorator
+
+# Drive methods accept a parsed Credentials object or its JSON form
+CredentialsLike = Union[Credentials, str]
+
+def parse_credentials(credentials_json: str) -> Credentials:
+    """Build Credentials from the JSON produced by Credentials.to_json()"""
+    info = json.loads(credentials_json)
+    expiry = info.get('expiry')
+    if expiry:
+        # Same format handling as Credentials.from_authorized_user_info
+        expiry = datetime.strptime(expiry.rstrip('Z').split('.')[0], '%Y-%m-%dT%H:%M:%S')
+    return Credentials(
+        token=info.get('token'),
+        refresh_token=info.get('refresh_token'),
+        token_uri=info.get('token_uri'),
+        client_id=info.get('client_id'),
+        client_secret=info.get('client_secret'),
+        scopes=info.get('scopes'),
+        expiry=expiry
+    )
 
 class GoogleAuth:
     """Handles Google OAuth2 authentication and Drive operations"""
@@ -19,6 +65,10 @@ class GoogleAuth:
         if Config.ENABLE_CACHE:
             self._setup_cache()
         self._initialize_auth_config(client_id, client_secret)
+        # session id -> (credentials JSON it was parsed from, Credentials)
+        self._credentials_cache: 'OrderedDict[str, Tuple[str, Credentials]]' = OrderedDict()
+        self._credentials_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
 
     def _setup_logging(self) -> None:
         """Configure logging"""
@@ -75,6 +125,7 @@ class GoogleAuth:
             self.logger.error(f"Failed to create auth flow: {str(e)}")
             raise
 
+    @_timed('fetch_token')
     def get_credentials(self, authorization_response: str, state: str, redirect_uri: str) -> str:
         try:
             flow = Flow.from_client_config(
@@ -89,55 +140,90 @@ class GoogleAuth:
             self.logger.error(f"Failed to get credentials: {str(e)}")
             raise
 
-    def get_user_info(self, credentials_json: str) -> Dict[str, Any]:
+    @_timed('user_info')
+    def get_user_info(self, credentials: CredentialsLike) -> Dict[str, Any]:
         try:
-            credentials_dict = json.loads(credentials_json)
-            if 'expiry' in credentials_dict:
-                credentials_dict['expiry'] = credentials_dict['expiry'].isoformat() if hasattr(credentials_dict['expiry'], 'isoformat') else str(credentials_dict['expiry'])
-
-            credentials = google.oauth2.credentials.Credentials(
-                token=credentials_dict.get('token'),
-                refresh_token=credentials_dict.get('refresh_token'),
-                token_uri=credentials_dict.get('token_uri'),
-                client_id=credentials_dict.get('client_id'),
-                client_secret=credentials_dict.get('client_secret'),
-                scopes=credentials_dict.get('scopes')
-            )
-            
-            service = googleapiclient.discovery.build('oauth2', 'v2', credentials=credentials)
+            service = googleapiclient.discovery.build(
+                'oauth2', 'v2', credentials=self._as_credentials(credentials))
             return service.userinfo().get().execute()
         except Exception as e:
             self.logger.error(f"Failed to get user info: {str(e)}")
             raise
 
+    #=============================================================================
+    # Credentials Cache
+    #=============================================================================
+    def credentials_for(self, session_id: str, credentials_json: str) -> Credentials:
+        """Parsed credentials for a session, reused across its requests
+
+        The cached object is refreshed in place when its token expires, so
+        it stays authoritative while the process runs; the session keeps
+        the original JSON, whose refresh token recovers after a restart.
+        """
+        with self._credentials_lock:
+            cached = self._credentials_cache.get(session_id)
+            if cached is not None and cached[0] == credentials_json:
+                self._credentials_cache.move_to_end(session_id)
+                return cached[1]
+
+        credentials = parse_credentials(credentials_json)
+        with self._credentials_lock:
+            self._credentials_cache[session_id] = (credentials_json, credentials)
+            self._credentials_cache.move_to_end(session_id)
+            while len(self._credentials_cache) > Config.CREDENTIALS_CACHE_SIZE:
+                self._credentials_cache.popitem(last=False)
+        return credentials
+
+    def forget_credentials(self, session_id: str) -> None:
+        """Drop a session's cached credentials, e.g. on logout"""
+        with self._credentials_lock:
+            self._credentials_cache.pop(session_id, None)
+
+    def _as_credentials(self, credentials: CredentialsLike) -> Credentials:
+        """Accept Credentials or JSON, refreshing an expired token in place"""
+        if not isinstance(credentials, Credentials):
+            credentials = parse_credentials(credentials)
+        if not credentials.valid and credentials.refresh_token:
+            with self._refresh_lock:
+                if not credentials.valid:
+                    credentials.refresh(Request())
+                    self.logger.info("Refreshed Google access token")
+        return credentials
+
     #=============================================================================
     # Drive Operations
     #=============================================================================
     
-    def _build_drive_service(self, credentials_json: str) -> Any:
+    def _build_drive_service(self, credentials: CredentialsLike) -> Any:
         """Build and return Google Drive service"""
-        credentials = google.oauth2.credentials.Credentials.from_authorized_user_info(
-            json.loads(credentials_json))
         return googleapiclient.discovery.build(
             'drive', 
             'v3', 
-            credentials=credentials,
+            credentials=self._as_credentials(credentials),
             cache_discovery=Config.CACHE_DISCOVERY  # Use config value
         )
 
-    def upload_to_drive(self, credentials_json: str, file_path: str, 
-                        mime_type: str = Config.MIME_TYPE) -> Optional[str]:
-        """Upload file to Google Drive"""
+    def upload_to_drive(self, credentials: CredentialsLike, file_path: str, 
+                        mime_type: str = Config.MIME_TYPE,
+                        file_name: str = Config.BACKUP_FILENAME) -> Optional[str]:
+        """Upload file to Google Drive, returning its file id"""
+        return self.upload_file(credentials, file_path, mime_type, file_name).get('id')
+
+    @_timed('drive_upload')
+    def upload_file(self, credentials: CredentialsLike, file_path: str,
+                    mime_type: str = Config.MIME_TYPE,
+                    file_name: str = Config.BACKUP_FILENAME) -> Dict[str, Any]:
+        """Upload file to Google Drive, returning its id and modifiedTime"""
         try:
-            service = self._build_drive_service(credentials_json)
+            service = self._build_drive_service(credentials)
             
             file_metadata = {
-                'name': Config.BACKUP_FILENAME,
+                'name': file_name,
                 'mimeType': mime_type
             }
             
             results = service.files().list(
-                q=f"name='{Config.BACKUP_FILENAME}'",
+                q=f"name='{file_name}'",
                 spaces='drive',
                 fields='files(id, name)'
             ).execute()
@@ -149,25 +235,27 @@ class GoogleAuth:
                 file_id = results['files'][0]['id']
                 file = service.files().update(
                     fileId=file_id,
-                    media_body=media
+                    media_body=media,
+                    fields='id, modifiedTime'
                 ).execute()
                 self.logger.info(f"Updated existing backup: {file_id}")
             else:
                 file = service.files().create(
                     body=file_metadata,
                     media_body=media,
-                    fields='id'
+                    fields='id, modifiedTime'
                 ).execute()
                 self.logger.info(f"Created new backup: {file.get('id')}")
             
-            return file.get('id')
+            return file
         except Exception as e:
             self.logger.error(f"Upload failed: {str(e)}")
             raise
 
-    def get_drive_file_metadata(self, credentials_json: str, file_name: str = Config.BACKUP_FILENAME) -> Optional[Dict[str, Any]]:
+    @_timed('drive_metadata')
+    def get_drive_file_metadata(self, credentials: CredentialsLike, file_name: str = Config.BACKUP_FILENAME) -> Optional[Dict[str, Any]]:
         try:
-            service = self._build_drive_service(credentials_json)
+            service = self._build_drive_service(credentials)
             
             results = service.files().list(
                 q=f"name='{file_name}'",
@@ -182,33 +270,38 @@ class GoogleAuth:
             self.logger.error(f"Failed to get file metadata: {str(e)}")
             raise
 
-    def download_from_drive(self, credentials_json: str, file_id: str) -> Dict[str, Any]:
+    @_timed('drive_download')
+    def download_file(self, credentials: CredentialsLike, file_id: str) -> bytes:
+        """Download a Drive file's raw content"""
         try:
-            service = self._build_drive_service(credentials_json)
+            service = self._build_drive_service(credentials)
             
             request = service.files().get_media(fileId=file_id)
-            file_content = request.execute()
-            
-            return json.loads(file_content)
+            return request.execute()
         except Exception as e:
             self.logger.error(f"Failed to download from Drive: {str(e)}")
             raise
 
+    def download_from_drive(self, credentials: CredentialsLike, file_id: str) -> Dict[str, Any]:
+        """Download and parse the tasks backup"""
+        return json.loads(self.download_file(credentials, file_id))
+
     #=============================================================================
     # Sync Operations
     #=============================================================================
     
-    def sync_with_cloud(self, credentials_json: str, task_manager: Any) -> bool:
+    def sync_with_cloud(self, credentials: CredentialsLike, task_manager: Any) -> bool:
         """Synchronize tasks with cloud storage"""
         try:
-            file_metadata = self.get_drive_file_metadata(credentials_json)
+            file_metadata = self.get_drive_file_metadata(credentials)
             
             if not file_metadata:
-                self.upload_to_drive(credentials_json, task_manager.tasks_file)
+                task_manager.flush()
+                self.upload_to_drive(credentials, task_manager.tasks_file)
                 self.logger.info("Created initial cloud backup")
                 return True
             
-            cloud_data = self.download_from_drive(credentials_json, file_metadata['id'])
+            cloud_data = self.download_from_drive(credentials, file_metadata['id'])
             cloud_sync_time = cloud_data.get('last_sync')
             
             if not task_manager.last_sync or (cloud_sync_time and cloud_sync_time > task_manager.last_sync):
@@ -216,7 +309,8 @@ class GoogleAuth:
                 return task_manager.merge_tasks(cloud_data)
             elif not cloud_sync_time or task_manager.last_sync > cloud_sync_time:
                 self.logger.info("Local data is newer, uploading changes")
-                self.upload_to_drive(credentials_json, task_manager.tasks_file)
+                task_manager.flush()
+                self.upload_to_drive(credentials, task_manager.tasks_file)
                 return True
             
             self.logger.info("No sync needed - data is up to date")
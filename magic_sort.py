@@ -2,19 +2,36 @@ from typing import Dict, Any, List, Optional, TypedDict
 from enum import Enum
 import json
 import os
-from pathlib import Path
 import logging
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from config import Config
+from metrics import registry
 
-# Initialize OpenAI client
-client = OpenAI(api_key=Config.OPENAI_API_KEY)
+# Shared OpenAI client, created on first use so importing this module
+# does not require an API key
+_default_client: Optional[Any] = None
 
-class TaskData(TypedDict):
-    """Type definition for task data"""
-    tasks: List[Dict[str, Any]]
-    last_sync: Optional[str]
+def create_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> OpenAI:
+    """Create an OpenAI client, optionally pointed at a compatible server"""
+    return OpenAI(
+        api_key=api_key or Config.OPENAI_API_KEY,
+        base_url=base_url or Config.OPENAI_BASE_URL
+    )
+
+def get_default_client() -> OpenAI:
+    """Return the shared client configured from Config"""
+    global _default_client
+    if _default_client is None:
+        _default_client = create_client()
+    return _default_client
+
+class SortResult(TypedDict):
+    """Type definition for a Magic Sort run result"""
+    categorizations: Dict[str, Dict[str, Any]]  # Task id -> fields to apply
+    stats: Dict[str, Any]
 
 class Quadrant(Enum):
     """Eisenhower Matrix Quadrants with descriptions"""
@@ -27,6 +44,8 @@ class Quadrant(Enum):
         self.code = code
         self.description = description
 
+QUADRANT_ORDER = {q.code: i for i, q in enumerate(Quadrant)}
+
 class TaskPriority:
     """Task priority configuration"""
     LEVELS = {
@@ -48,16 +67,125 @@ class TaskPriority:
     THRESHOLDS = {'urgency': 4, 'importance': 4}
     DEFAULTS = {'urgency': 3, 'importance': 3, 'quadrant': Quadrant.Q4.code}
 
+#=============================================================================
+# Instrumentation
+#=============================================================================
+LLM_LATENCY = registry.histogram(
+    'magic_sort_llm_latency_seconds', 'Latency of OpenAI chat completion calls',
+    labels=('model', 'outcome'))
+LLM_CALLS = registry.counter(
+    'magic_sort_llm_calls_total', 'OpenAI chat completion calls issued',
+    labels=('model', 'outcome'))
+LLM_TOKENS = registry.counter(
+    'magic_sort_llm_tokens_total', 'Tokens reported in response.usage',
+    labels=('model', 'kind'))
+LLM_RETRIES = registry.counter(
+    'magic_sort_llm_retries_total', 'Retries taken by the OpenAI client',
+    labels=('model',))
+FALLBACKS = registry.counter(
+    'magic_sort_fallbacks_total', 'Tasks that fell back to TaskPriority.DEFAULTS',
+    labels=('reason',))
+JSON_PARSE_FAILURES = registry.counter(
+    'magic_sort_json_parse_failures_total', 'Completions that were not valid JSON')
+RUN_DURATION = registry.histogram(
+    'magic_sort_run_duration_seconds', 'Wall time of a full process_tasks run',
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0))
+RUN_TASKS = registry.counter(
+    'magic_sort_run_tasks_total', 'Tasks seen by process_tasks',
+    labels=('action',))
+
+class SortRunStats:
+    """Aggregates LLM call statistics for a single Magic Sort run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Calls within a run complete concurrently
+        self.started = time.perf_counter()
+        self.latencies: List[float] = []
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.fallbacks: Dict[str, int] = {}
+        self.json_parse_failures = 0
+        self.tasks_total = 0
+        self.tasks_categorized = 0
+
+    def record_call(self, latency: float, ok: bool, retries: int,
+                    prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.latencies.append(latency)
+            if not ok:
+                self.errors += 1
+            self.retries += retries
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def record_fallback(self, reason: str) -> None:
+        with self._lock:
+            self.fallbacks[reason] = self.fallbacks.get(reason, 0) + 1
+            if reason == 'json_parse':
+                self.json_parse_failures += 1
+
+    @staticmethod
+    def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return round(ordered[index], 4)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary suitable for the /magic-sort response"""
+        ordered = sorted(self.latencies)
+        return {
+            'duration_seconds': round(time.perf_counter() - self.started, 4),
+            'tasks_total': self.tasks_total,
+            'tasks_categorized': self.tasks_categorized,
+            'llm_calls': self.calls,
+            'llm_errors': self.errors,
+            'llm_retries': self.retries,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'fallbacks': dict(self.fallbacks),
+            'json_parse_failures': self.json_parse_failures,
+            'latency_seconds': {
+                'total': round(sum(ordered), 4),
+                'p50': self._percentile(ordered, 0.5),
+                'p95': self._percentile(ordered, 0.95),
+                'max': round(ordered[-1], 4) if ordered else None
+            }
+        }
+
 class MagicSort:
     """Task analyzer using OpenAI API and Eisenhower Matrix"""
     
-    def __init__(self):
-        """Initialize MagicSort with configuration"""
+    def __init__(self, client: Optional[Any] = None, concurrency: Optional[int] = None):
+        """Initialize MagicSort with configuration
+
+        Args:
+            client: Any object exposing the OpenAI SDK's
+                ``chat.completions.create``. When it also has
+                ``chat.completions.with_raw_response`` (as the SDK does),
+                that is used so retries can be counted. Defaults to the
+                shared client built from Config.
+            concurrency: Maximum completion requests in flight during a run.
+                Defaults to Config.MAGIC_SORT_CONCURRENCY.
+        """
+        self._client = client
+        self.concurrency = max(1, concurrency or Config.MAGIC_SORT_CONCURRENCY)
         self._initialize_config()
 
+    @property
+    def client(self) -> Any:
+        """OpenAI client used for completions"""
+        if self._client is None:
+            self._client = get_default_client()
+        return self._client
+
     def _initialize_config(self) -> None:
         """Set up configuration and logging"""
-        self.tasks_file = Path(__file__).parent / 'tasks.json'
+        self.model = "gpt-3.5-turbo"
         
         # Configure logging
         self.logger = logging.getLogger('MagicSort')
@@ -107,14 +235,46 @@ NO EXPLANATION. NO ADDITIONAL TEXT.
 
 Task: "{task_content}"'''
 
-    def categorize_task(self, task_content: str) -> Dict[str, Any]:
+    def _record_call(self, started: float, response: Any, retries: int,
+                     run_stats: Optional[SortRunStats]) -> None:
+        """Record latency, token usage and retries for one completion call"""
+        latency = time.perf_counter() - started
+        outcome = 'success' if response is not None else 'error'
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+
+        LLM_LATENCY.observe(latency, model=self.model, outcome=outcome)
+        LLM_CALLS.inc(model=self.model, outcome=outcome)
+        if prompt_tokens:
+            LLM_TOKENS.inc(prompt_tokens, model=self.model, kind='prompt')
+        if completion_tokens:
+            LLM_TOKENS.inc(completion_tokens, model=self.model, kind='completion')
+        if retries:
+            LLM_RETRIES.inc(retries, model=self.model)
+        if run_stats is not None:
+            run_stats.record_call(latency, response is not None, retries,
+                                  prompt_tokens, completion_tokens)
+
+    def _fallback(self, reason: str, run_stats: Optional[SortRunStats]) -> Dict[str, Any]:
+        """Count a fallback and return the default categorization"""
+        FALLBACKS.inc(reason=reason)
+        if reason == 'json_parse':
+            JSON_PARSE_FAILURES.inc()
+        if run_stats is not None:
+            run_stats.record_fallback(reason)
+        return TaskPriority.DEFAULTS.copy()
+
+    def categorize_task(self, task_content: str,
+                        run_stats: Optional[SortRunStats] = None) -> Dict[str, Any]:
         """Analyze and categorize a task using OpenAI API"""
         if not task_content or not task_content.strip():
-            return TaskPriority.DEFAULTS.copy()
+            return self._fallback('empty_content', run_stats)
 
+        started = time.perf_counter()
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            request = dict(
+                model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a professional task analyzer. Always return JSON in the exact required format."},
                     {"role": "user", "content": self._construct_prompt(task_content)}
@@ -122,17 +282,32 @@ Task: "{task_content}"'''
                 temperature=0,
                 max_tokens=100
             )
-            
+            completions = self.client.chat.completions
+            if hasattr(completions, 'with_raw_response'):
+                # The raw response carries the retry count for the metrics
+                raw_response = completions.with_raw_response.create(**request)
+                response = raw_response.parse()
+            else:
+                raw_response = None
+                response = completions.create(**request)
+        except Exception as e:
+            self._record_call(started, None, 0, run_stats)
+            self.logger.error(f"Categorization error: {str(e)}")
+            return self._fallback('api_error', run_stats)
+
+        self._record_call(started, response, getattr(raw_response, 'retries_taken', 0), run_stats)
+
+        try:
             try:
                 result = json.loads(response.choices[0].message.content)
             except json.JSONDecodeError:
                 self.logger.error("Invalid JSON response from API")
-                return TaskPriority.DEFAULTS.copy()
+                return self._fallback('json_parse', run_stats)
 
             # Validate result structure
             if not all(k in result for k in ['urgency', 'importance']):
                 self.logger.error("Missing required fields in API response")
-                return TaskPriority.DEFAULTS.copy()
+                return self._fallback('missing_fields', run_stats)
 
             # Ensure values are within valid ranges
             result['urgency'] = max(1, min(5, int(result['urgency'])))
@@ -144,12 +319,12 @@ Task: "{task_content}"'''
                 result['importance']
             ))
             
-            self.logger.info(f"Task categorized successfully: {task_content[:50]}...")
+            self.logger.debug(f"Task categorized successfully: {task_content[:50]}...")
             return result
             
         except Exception as e:
             self.logger.error(f"Categorization error: {str(e)}")
-            return TaskPriority.DEFAULTS.copy()
+            return self._fallback('invalid_response', run_stats)
 
     def _needs_categorization(self, task: Dict[str, Any]) -> bool:
         """Check if a task needs to be categorized"""
@@ -159,73 +334,52 @@ Task: "{task_content}"'''
             'quadrant' not in task
         )
 
-    def process_tasks(self) -> Optional[TaskData]:
-        """Process and sort all tasks"""
+    def process_tasks(self, tasks: List[Dict[str, Any]]) -> Optional[SortResult]:
+        """Categorize tasks and return the fields to apply, keyed by task id
+        
+        Nothing is written: the caller applies the result to its current
+        tasks (TaskManager.apply_categorizations), since the list may have
+        changed while completions were in flight.
+        """
+        run_stats = SortRunStats()
         try:
-            data = self._read_tasks()
-            tasks = data.get('tasks', [])
-            
-            # Process each task while preserving original data
-            processed_tasks = []
-            categorized_count = 0
-            for task in tasks:
-                task_copy = task.copy()  # Work on a copy to avoid modifying original
-                if content := task_copy.get('content'):
-                    if self._needs_categorization(task_copy):
-                        categorization = self.categorize_task(content)
-                        task_copy.update(categorization)
-                        categorized_count += 1
-                    # Recalculate quadrant based on urgency and importance
-                    elif 'urgency' in task_copy and 'importance' in task_copy:
-                        task_copy['quadrant'] = str(self.determine_quadrant(task_copy['urgency'], task_copy['importance']))
-                    processed_tasks.append(task_copy)
+            run_stats.tasks_total = len(tasks)
             
-            # Sort tasks but don't add quadrant_class
-            sorted_tasks = self._sort_tasks(processed_tasks)
-            
-            output_data = {
-                'tasks': sorted_tasks,
-                'last_sync': data.get('last_sync') or datetime.now().isoformat()
-            }
+            # Categorize tasks with up to `concurrency` OpenAI requests in flight
+            pending = [task for task in tasks
+                       if task.get('content') and self._needs_categorization(task)]
+            categorizations = {}
+            if pending:
+                with ThreadPoolExecutor(max_workers=min(self.concurrency, len(pending))) as pool:
+                    results = pool.map(lambda task: self.categorize_task(task['content'], run_stats), pending)
+                    categorizations = {str(task['id']): result for task, result in zip(pending, results)}
+            run_stats.tasks_categorized = len(categorizations)
             
-            if self._save_tasks(output_data):
-                self.logger.info(f"Processed {categorized_count} uncategorized tasks out of {len(processed_tasks)} total tasks")
-                return output_data
+            # Recalculate quadrant based on urgency and importance for the rest
+            for task in tasks:
+                task_id = str(task['id'])
+                if (task_id not in categorizations and task.get('content')
+                        and 'urgency' in task and 'importance' in task):
+                    categorizations[task_id] = {
+                        'quadrant': str(self.determine_quadrant(task['urgency'], task['importance']))
+                    }
             
-            return None
+            self.logger.info(f"Processed {run_stats.tasks_categorized} uncategorized tasks out of {len(tasks)} total tasks")
+            return {'categorizations': categorizations, 'stats': run_stats.to_dict()}
             
         except Exception as e:
             self.logger.error(f"Task processing error: {str(e)}")
             return None
+        finally:
+            RUN_DURATION.observe(time.perf_counter() - run_stats.started)
+            RUN_TASKS.inc(run_stats.tasks_categorized, action='categorized')
+            RUN_TASKS.inc(run_stats.tasks_total - run_stats.tasks_categorized, action='skipped')
 
-    def _read_tasks(self) -> TaskData:
-        """Read and parse tasks file safely"""
-        try:
-            if self.tasks_file.exists():
-                with open(self.tasks_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            self.logger.warning(f"Error reading tasks file: {str(e)}")
-        return {'tasks': [], 'last_sync': None}
-
-    def _save_tasks(self, data: TaskData) -> bool:
-        """Save tasks data to file"""
-        try:
-            with open(self.tasks_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            self.logger.error(f"Error saving tasks file: {str(e)}")
-            return False
-
-    def _sort_tasks(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Sort tasks by quadrant and priority levels"""
-        quadrant_order = {q.code: i for i, q in enumerate(Quadrant)}
-        return sorted(
-            tasks,
-            key=lambda x: (
-                quadrant_order.get(x.get('quadrant'), 999),
-                -x.get('urgency', 0),
-                -x.get('importance', 0)
-            )
+    @staticmethod
+    def sort_key(task: Dict[str, Any]) -> tuple:
+        """Order by quadrant, then by urgency and importance, highest first"""
+        return (
+            QUADRANT_ORDER.get(task.get('quadrant'), 999),
+            -task.get('urgency', 0),
+            -task.get('importance', 0)
         )
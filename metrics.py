@@ -0,0 +1,237 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Default latency buckets in seconds, tuned for network-bound calls
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Buckets for in-process work such as request handling and file I/O
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Buckets for HTTP requests, from cached reads to slow external syncs
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Buckets for lock acquisition, where anything above a millisecond is contention
+LOCK_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+# Buckets for payload sizes in bytes
+BYTE_BUCKETS = (1024, 16384, 131072, 1048576, 8388608, 67108864)
+
+LabelKey = Tuple[str, ...]
+
+#=============================================================================
+# Metric Types
+#=============================================================================
+class Counter:
+    """Monotonically increasing value, optionally split by labels"""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter for the given label values"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value for the given label values"""
+        return self._values.get(self._key(labels), 0)
+
+    def snapshot(self) -> List[Dict]:
+        """Return all label combinations and their values"""
+        with self._lock:
+            items = list(self._values.items())
+        return [{'labels': dict(zip(self.labels, key)), 'value': value}
+                for key, value in items]
+
+class Gauge:
+    """Value that can go up and down, or be computed at export time"""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[LabelKey, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the (unlabelled) value lazily whenever metrics are exported"""
+        self._function = function
+
+    def snapshot(self) -> List[Dict]:
+        if self._function is not None:
+            return [{'labels': {}, 'value': self._function()}]
+        with self._lock:
+            items = list(self._values.items())
+        return [{'labels': dict(zip(self.labels, key)), 'value': value}
+                for key, value in items]
+
+class Histogram:
+    """Bucketed distribution of observed values, optionally split by labels"""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label key: [bucket counts..., +Inf count], sum, count
+        self._series: Dict[LabelKey, List] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record a single observation"""
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the enclosed block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> List[Dict]:
+        """Return cumulative bucket counts, sum and count per label combination"""
+        with self._lock:
+            items = [(key, list(s[0]), s[1], s[2]) for key, s in self._series.items()]
+
+        result = []
+        for key, counts, total, count in items:
+            cumulative, running = {}, 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                running += bucket_count
+                cumulative[str(bound)] = running
+            cumulative['+Inf'] = count
+            result.append({
+                'labels': dict(zip(self.labels, key)),
+                'buckets': cumulative,
+                'sum': total,
+                'count': count
+            })
+        return result
+
+#=============================================================================
+# Registry
+#=============================================================================
+class MetricsRegistry:
+    """Holds named metrics so they can be exported together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered with another type")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str, labels: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._register(Gauge(name, description, labels))
+
+    def histogram(self, name: str, description: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def get(self, name: str) -> Optional[object]:
+        return self._metrics.get(name)
+
+    def snapshot(self, prefix: str = '') -> Dict[str, Dict]:
+        """Return a JSON-serializable view of all metrics matching prefix"""
+        with self._lock:
+            metrics = [m for name, m in self._metrics.items() if name.startswith(prefix)]
+        return {
+            m.name: {
+                'type': _metric_type(m),
+                'description': m.description,
+                'series': m.snapshot()
+            } for m in metrics
+        }
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines: List[str] = []
+        for metric in metrics:
+            kind = _metric_type(metric)
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.description)}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            for series in metric.snapshot():
+                labels = series['labels']
+                if kind == 'histogram':
+                    for bound, count in series['buckets'].items():
+                        lines.append(f"{metric.name}_bucket{_format_labels(labels, le=bound)} {count}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(series['sum'])}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {series['count']}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(series['value'])}")
+        return "\n".join(lines) + "\n"
+
+#=============================================================================
+# Prometheus Formatting
+#=============================================================================
+def _metric_type(metric: object) -> str:
+    if isinstance(metric, Counter):
+        return 'counter'
+    if isinstance(metric, Gauge):
+        return 'gauge'
+    return 'histogram'
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(str(value))}"' for name, value in pairs.items()) + '}'
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+# Process-wide registry shared by all services
+registry = MetricsRegistry()
@@ -0,0 +1,131 @@
+import cProfile
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from flask import Flask, Response, g, request
+
+from config import Config
+
+PROFILE_HEADER = 'X-Profile-Token'
+
+class RequestProfiler:
+    """Captures cProfile data for selected Flask requests
+
+    A request is profiled when it carries ``X-Profile-Token`` matching
+    Config.PROFILE_TOKEN, or when it is picked by Config.PROFILE_SAMPLE_RATE.
+    Each capture is written to Config.PROFILE_DIR as a ``.prof`` file (open it
+    with ``snakeviz`` or ``python -m pstats``) plus a ``.json`` file holding
+    the route and timing metadata. Only one request is profiled at a time.
+    """
+
+    def __init__(self, app: Optional[Flask] = None):
+        self._setup_logging()
+        self._active = threading.Lock()
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def _setup_logging(self) -> None:
+        """Configure logging"""
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger('RequestProfiler')
+
+    def init_app(self, app: Flask) -> None:
+        """Register request hooks if profiling is enabled in Config"""
+        self.enabled = Config.PROFILING_ENABLED
+        if not self.enabled:
+            return
+        self.output_dir = Config.PROFILE_DIR
+        self.sample_rate = Config.PROFILE_SAMPLE_RATE
+        self.token = Config.PROFILE_TOKEN
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        app.before_request(self._start)
+        app.after_request(self._record_status)
+        app.teardown_request(self._finish)
+        self.logger.info(f"Request profiling enabled, writing to {self.output_dir}")
+
+    #=============================================================================
+    # Request Hooks
+    #=============================================================================
+    def _trigger(self) -> Optional[str]:
+        """Return why this request should be profiled, if at all"""
+        supplied = request.headers.get(PROFILE_HEADER)
+        if supplied and self.token and hmac.compare_digest(supplied, self.token):
+            return 'header'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sample'
+        return None
+
+    def _start(self) -> None:
+        trigger = self._trigger()
+        # cProfile can't run nested profilers; skip while another capture runs
+        if not trigger or not self._active.acquire(blocking=False):
+            return
+        g.profile = {
+            'profiler': cProfile.Profile(),
+            'trigger': trigger,
+            'started_at': datetime.now().isoformat(),
+            'started': time.perf_counter()
+        }
+        g.profile['profiler'].enable()
+
+    def _record_status(self, response: Response) -> Response:
+        profile = g.get('profile')
+        if profile is not None:
+            profile['status'] = response.status_code
+            profile['id'] = self._profile_id()
+            response.headers['X-Profile-Id'] = profile['id']
+        return response
+
+    def _finish(self, exc: Optional[BaseException]) -> None:
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        try:
+            profile['profiler'].disable()
+            duration = time.perf_counter() - profile['started']
+            self._write(profile, duration, exc)
+        except Exception as e:
+            self.logger.error(f"Failed to write profile: {str(e)}")
+        finally:
+            self._active.release()
+
+    #=============================================================================
+    # Output
+    #=============================================================================
+    def _profile_id(self) -> str:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'index'
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        return f"{stamp}-{request.method.lower()}-{slug}"
+
+    def _write(self, profile: Dict[str, Any], duration: float,
+               exc: Optional[BaseException]) -> None:
+        profile_id = profile.get('id') or self._profile_id()
+        base = os.path.join(self.output_dir, profile_id)
+        profile['profiler'].dump_stats(f"{base}.prof")
+
+        metadata = {
+            'id': profile_id,
+            'route': request.url_rule.rule if request.url_rule else None,
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': profile.get('status', 500 if exc else None),
+            'trigger': profile['trigger'],
+            'started_at': profile['started_at'],
+            'duration_seconds': round(duration, 6),
+            'error': str(exc) if exc else None
+        }
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+        self.logger.info(f"Profiled {request.method} {request.path} in {duration:.3f}s -> {base}.prof")
@@ -0,0 +1,228 @@
+import heapq
+import math
+import re
+from bisect import bisect_left
+from operator import itemgetter
+from typing import Any, Dict, List, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.casefold()) if text else []
+
+class SearchIndex:
+    """In-memory inverted index over task content
+
+    Queries match tasks containing every query term. The last term also
+    matches as a prefix so results update as the user types. Results are
+    ranked by how rare the matched terms are (idf), preferring whole-word
+    over prefix matches and shorter tasks over longer ones.
+
+    Each term keeps its postings twice: a set for document frequency and
+    the same tasks bucketed by task length. Every task in a bucket scores
+    the same for that term, so ranking visits buckets best first,
+    intersects them with the other query terms' buckets of that length
+    using set operations, and stops after ``limit`` hits. Common terms cost
+    about as much as rare ones; queries of several common words cost about
+    one intersection of their buckets per task length.
+    """
+
+    # A prefix expands to at most this many vocabulary terms, the ones in
+    # the most tasks, so short prefixes such as "a" stay cheap; rarer
+    # completions are only found once more of the word is typed
+    MAX_PREFIX_TERMS = 64
+    PREFIX_WEIGHT = 0.5
+    LENGTH_PENALTY = 0.05
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+        self._by_length: Dict[str, Dict[int, Set[str]]] = {}
+        self._doc_content: Dict[str, str] = {}
+        self._doc_tokens: Dict[str, Tuple[str, ...]] = {}
+        self._vocabulary: List[str] = []
+        # Ranked expansions of prefixes with too many completions, kept until
+        # the vocabulary changes
+        self._expansions: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    #=============================================================================
+    # Maintenance
+    #=============================================================================
+    def rebuild(self, tasks: List[Dict[str, Any]]) -> None:
+        """Index all tasks from scratch"""
+        self._postings = {}
+        self._by_length = {}
+        self._doc_content = {}
+        self._doc_tokens = {}
+        for task in tasks:
+            self._index(str(task['id']), task.get('content', ''))
+        self._vocabulary = sorted(self._postings)
+        self._expansions = {}
+
+    def _index(self, task_id: str, content: str) -> bool:
+        """Add a task's terms to the postings; True if it added new terms"""
+        tokens = tuple(tokenize(content))
+        self._doc_content[task_id] = content
+        self._doc_tokens[task_id] = tokens
+        new_terms = False
+        for token in set(tokens):
+            if token not in self._postings:
+                self._postings[token] = set()
+                self._by_length[token] = {}
+                new_terms = True
+            self._postings[token].add(task_id)
+            self._by_length[token].setdefault(len(tokens), set()).add(task_id)
+        return new_terms
+
+    def add(self, task: Dict[str, Any]) -> None:
+        """Index a new task, or re-index an existing one"""
+        task_id = str(task['id'])
+        content = task.get('content', '')
+        if self._doc_content.get(task_id) == content:
+            return
+        self.remove(task_id)
+        if self._index(task_id, content):
+            self._expansions = {}
+            for token in set(self._doc_tokens[task_id]):
+                i = bisect_left(self._vocabulary, token)
+                if i == len(self._vocabulary) or self._vocabulary[i] != token:
+                    self._vocabulary.insert(i, token)
+
+    update = add
+
+    def sync(self, tasks: List[Dict[str, Any]]) -> None:
+        """Bring the index in line with a new task list, touching only changed tasks"""
+        current_ids = set()
+        for task in tasks:
+            current_ids.add(str(task['id']))
+            self.add(task)
+        for task_id in [task_id for task_id in self._doc_tokens if task_id not in current_ids]:
+            self.remove(task_id)
+
+    def remove(self, task_id: str) -> None:
+        """Drop a task from the index"""
+        task_id = str(task_id)
+        self._doc_content.pop(task_id, None)
+        tokens = self._doc_tokens.pop(task_id, None)
+        if tokens is None:
+            return
+        for token in set(tokens):
+            postings = self._postings[token]
+            postings.discard(task_id)
+            buckets = self._by_length[token]
+            bucket = buckets[len(tokens)]
+            bucket.discard(task_id)
+            if not bucket:
+                del buckets[len(tokens)]
+            if not postings:
+                del self._postings[token]
+                del self._by_length[token]
+                self._expansions = {}
+                i = bisect_left(self._vocabulary, token)
+                if i < len(self._vocabulary) and self._vocabulary[i] == token:
+                    del self._vocabulary[i]
+
+    #=============================================================================
+    # Queries
+    #=============================================================================
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """Vocabulary terms starting with prefix, the most frequent if there are too many
+
+        Ranking thousands of completions costs more than the rest of the
+        query, so the ranking is cached; frequencies that drift while the
+        vocabulary stays the same only reorder terms near the cutoff.
+        """
+        expansions = self._expansions.get(prefix)
+        if expansions is not None:
+            return expansions
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + '\U0010ffff', start)
+        terms = self._vocabulary[start:end]
+        if len(terms) <= self.MAX_PREFIX_TERMS:
+            return terms
+        frequencies = map(len, map(self._postings.__getitem__, terms))
+        expansions = [term for _, term in heapq.nlargest(self.MAX_PREFIX_TERMS, zip(frequencies, terms))]
+        self._expansions[prefix] = expansions
+        return expansions
+
+    def _idf(self, term: str) -> float:
+        return math.log(1 + len(self._doc_tokens) / (1 + len(self._postings[term])))
+
+    def _rank(self, filters: List[Dict[int, Set[str]]], weights: Dict[str, float],
+              limit: int) -> List[Tuple[float, str]]:
+        """Best ``limit`` tasks in every filter and in some weighted term's postings
+
+        Tasks of one length containing one weighted term all score the
+        same, so those buckets are visited best score first and the walk
+        stops as soon as ``limit`` tasks are found. Filters are intersected
+        per length, and only for lengths the walk reaches; buckets smaller
+        than the filters are intersected with them directly instead.
+        """
+        penalty = self.LENGTH_PENALTY
+        buckets = [(weight / (1.0 + penalty * length), length, bucket)
+                   for term, weight in weights.items()
+                   for length, bucket in self._by_length[term].items()]
+        buckets.sort(key=itemgetter(0), reverse=True)
+        parts_by_length: Dict[int, List[Set[str]]] = {}
+        matches_by_length: Dict[int, Set[str]] = {}
+        found: Set[str] = set()
+        ranked: List[Tuple[float, str]] = []
+        for score, length, bucket in buckets:
+            if filters:
+                parts = parts_by_length.get(length)
+                if parts is None:
+                    parts = [postings.get(length) for postings in filters]
+                    parts = sorted(parts, key=len) if all(parts) else []
+                    parts_by_length[length] = parts
+                if not parts:
+                    continue
+                matches = matches_by_length.get(length)
+                if matches is None and len(bucket) < len(parts[0]):
+                    # Cheaper to check this bucket's tasks than to intersect the filters
+                    bucket = bucket.intersection(*parts)
+                else:
+                    if matches is None:
+                        matches = parts[0].intersection(*parts[1:]) if len(parts) > 1 else parts[0]
+                        matches_by_length[length] = matches
+                    bucket = matches & bucket
+            for task_id in bucket:
+                # A task in several buckets keeps the score of the first, its best
+                if task_id not in found:
+                    found.add(task_id)
+                    ranked.append((-score, task_id))
+                    if len(ranked) >= limit:
+                        break
+            if len(ranked) >= limit:
+                break
+        ranked.sort()
+        return [(-negative_score, task_id) for negative_score, task_id in ranked]
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` (task id, score) pairs, best first"""
+        terms = tokenize(query)
+        if not terms or limit < 1:
+            return []
+
+        exact_terms = list(dict.fromkeys(terms[:-1] if prefix else terms))
+        if any(term not in self._postings for term in exact_terms):
+            return []
+        # Every match contains all exact terms, so they add the same amount to each score
+        base = sum(self._idf(term) for term in exact_terms)
+
+        if prefix:
+            last = terms[-1]
+            weights = {term: base + self._idf(term) * (1.0 if term == last else self.PREFIX_WEIGHT)
+                       for term in self._expand_prefix(last)}
+            if not weights:
+                return []
+        else:
+            rarest = min(exact_terms, key=lambda term: len(self._postings[term]))
+            weights = {rarest: base}
+            exact_terms.remove(rarest)
+
+        filters = [self._by_length[term] for term in exact_terms]
+        results = self._rank(filters, weights, limit)
+        return [(task_id, round(score, 4)) for score, task_id in results]
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Flask, Request, Response
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from config import Config
+
+#=============================================================================
+# Stores
+#=============================================================================
+class SessionStore(ABC):
+    """Keeps session data server-side, keyed by an opaque session id"""
+
+    @abstractmethod
+    def load(self, sid: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return the session data and its expiry time, or None if unknown or expired"""
+
+    @abstractmethod
+    def save(self, sid: str, data: Dict[str, Any], lifetime: int) -> None:
+        """Store the session data for ``lifetime`` seconds"""
+
+    @abstractmethod
+    def delete(self, sid: str) -> None:
+        """Forget the session"""
+
+class MemorySessionStore(SessionStore):
+    """Sessions held in this process; lost on restart and not shared between workers"""
+
+    # Sweep expired sessions every this many saves
+    PRUNE_EVERY = 256
+
+    def __init__(self):
+        self._sessions: Dict[str, tuple] = {}  # sid -> (expires, data)
+        self._saves = 0
+        self._lock = threading.Lock()
+
+    def load(self, sid: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        entry = self._sessions.get(sid)
+        if entry is None:
+            return None
+        expires, data = entry
+        if expires < time.time():
+            self.delete(sid)
+            return None
+        return dict(data), expires
+
+    def save(self, sid: str, data: Dict[str, Any], lifetime: int) -> None:
+        with self._lock:
+            self._sessions[sid] = (time.time() + lifetime, dict(data))
+            self._saves += 1
+            if self._saves % self.PRUNE_EVERY == 0:
+                now = time.time()
+                for expired in [key for key, (expires, _) in self._sessions.items() if expires < now]:
+                    del self._sessions[expired]
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a SQLite file, shared by every worker process on the host"""
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._saves = 0
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS sessions '
+                '(id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)')
+
+    def load(self, sid: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data, expires FROM sessions WHERE id = ?', (sid,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < time.time():
+            self.delete(sid)
+            return None
+        return json.loads(row[0]), row[1]
+
+    def save(self, sid: str, data: Dict[str, Any], lifetime: int) -> None:
+        payload = json.dumps(data)
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO sessions (id, data, expires) VALUES (?, ?, ?)',
+                (sid, payload, time.time() + lifetime))
+            self._saves += 1
+            if self._saves % self.PRUNE_EVERY == 0:
+                self._connection.execute('DELETE FROM sessions WHERE expires < ?', (time.time(),))
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._connection.execute('DELETE FROM sessions WHERE id = ?', (sid,))
+
+class FileSessionStore(SessionStore):
+    """One JSON file per session in a directory, shared by every worker process"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, sid: str) -> str:
+        # Hash the id so a crafted cookie can't name a path
+        return os.path.join(self.directory, f"{hashlib.sha256(sid.encode('utf-8')).hexdigest()}.json")
+
+    def load(self, sid: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        try:
+            with open(self._path(sid), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('expires', 0) < time.time():
+            self.delete(sid)
+            return None
+        return entry.get('data') or {}, entry['expires']
+
+    def save(self, sid: str, data: Dict[str, Any], lifetime: int) -> None:
+        path = self._path(sid)
+        temp_file = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'expires': time.time() + lifetime, 'data': data}, f)
+        os.replace(temp_file, path)
+
+    def delete(self, sid: str) -> None:
+        try:
+            os.remove(self._path(sid))
+        except FileNotFoundError:
+            pass
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """Build the store selected by Config.SESSION_BACKEND (memory, sqlite or file)"""
+    backend = (backend or Config.SESSION_BACKEND).lower()
+    if backend == 'sqlite':
+        return SQLiteSessionStore(Config.SESSION_SQLITE_PATH)
+    if backend == 'file':
+        return FileSessionStore(Config.SESSION_FILE_DIR)
+    if backend != 'memory':
+        raise ValueError(f"Unknown session backend: {backend}")
+    return MemorySessionStore()
+
+#=============================================================================
+# Flask Integration
+#=============================================================================
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session dict tracking its id and whether it needs saving"""
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None, sid: str = '', new: bool = False,
+                 expires: Optional[float] = None):
+        def on_update(session: 'ServerSideSession') -> None:
+            session.modified = True
+            session.accessed = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires = expires  # When the stored entry expires, if it was loaded
+        self.modified = False
+        self.previous_sid: Optional[str] = None
+
+    def regenerate(self) -> None:
+        """Move the data to a fresh id, e.g. on login to prevent session fixation"""
+        if not self.new:
+            self.previous_sid = self.sid
+        self.sid = ServerSideSessionInterface.generate_sid()
+        self.modified = True
+
+class ServerSideSessionInterface(SessionInterface):
+    """Stores session data in a SessionStore; the cookie carries only the id
+
+    Requests read one store entry instead of verifying and decoding a
+    signed cookie, and the cookie stays the same size whatever the
+    session holds. Entries are written when the session changes, and
+    rewritten once less than half their lifetime remains, so they expire
+    ``lifetime`` seconds after the last activity rather than after login.
+    """
+
+    def __init__(self, store: SessionStore, lifetime: int):
+        self.store = store
+        self.lifetime = lifetime
+        self.logger = logging.getLogger('SessionStore')
+
+    @staticmethod
+    def generate_sid() -> str:
+        return secrets.token_urlsafe(32)
+
+    def open_session(self, app: Flask, request: Request) -> ServerSideSession:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            try:
+                entry = self.store.load(sid)
+            except Exception as e:
+                self.logger.error(f"Failed to load session: {str(e)}")
+                entry = None
+            if entry is not None:
+                data, expires = entry
+                return ServerSideSession(data, sid=sid, expires=expires)
+        return ServerSideSession(sid=self.generate_sid(), new=True)
+
+    def save_session(self, app: Flask, session: ServerSideSession, response: Response) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+        if session.previous_sid:
+            self.store.delete(session.previous_sid)
+
+        # An emptied session (logout) drops both the entry and the cookie
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+
+        # Active sessions push their expiry forward, writing at most once per half lifetime
+        stale = session.expires is not None and session.expires - time.time() < self.lifetime / 2
+        if not session.modified and not stale:
+            return
+        self.store.save(session.sid, dict(session), self.lifetime)
+        if session.new or session.previous_sid or session.permanent:
+            response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                                httponly=httponly, domain=domain, path=path, secure=secure,
+                                samesite=samesite)
+            response.vary.add('Cookie')
@@ -182,11 +182,8 @@ const TaskManager = {
       const data = await response.json();
 
       if (data.status === "success") {
-        const taskElement = this.createTaskElement(data.task);
-        const taskList = DOM.get("taskList");
-
-        taskList.appendChild(taskElement);
-        this.animateTaskElement(taskElement);
+        // The change feed may already have drawn the row while the POST was in flight
+        ChangeFeed.applyAdd(data.task);
 
         this.resetStyles();
 
@@ -532,11 +529,232 @@ const TaskManager = {
   },
 };
 
+//=============================================================================
+// MODULE: Task Pagination
+//=============================================================================
+/**
+ * Lazily loads further pages from GET /tasks as the user scrolls
+ */
+const TaskPager = {
+  cursor: null,
+  pageSize: 50,
+  maxPageSize: 500, // Server caps pages at TASK_PAGE_SIZE_MAX
+  pending: null, // Page request in flight, shared by concurrent callers
+  observer: null,
+
+  reset(cursor = null) {
+    this.cursor = cursor;
+  },
+
+  loadNextPage(limit = this.pageSize) {
+    if (!this.cursor) return Promise.resolve();
+    if (!this.pending) {
+      this.pending = this.fetchPage(limit).finally(() => {
+        this.pending = null;
+      });
+    }
+    return this.pending;
+  },
+
+  /**
+   * Loads every remaining page, e.g. for the matrix view, which shows all
+   * tasks rather than the ones scrolled into the list so far
+   */
+  async loadAll() {
+    while (this.cursor) {
+      const cursor = this.cursor;
+      await this.loadNextPage(this.maxPageSize);
+      if (this.cursor === cursor) break; // Request failed; keep what we have
+    }
+  },
+
+  async fetchPage(limit) {
+    try {
+      const params = new URLSearchParams({
+        cursor: this.cursor,
+        limit,
+      });
+      const response = await fetch(`/tasks?${params}`);
+      if (!response.ok)
+        throw new Error(`HTTP error! status: ${response.status}`);
+      const data = await response.json();
+
+      if (data.status !== "success") {
+        throw new Error(data.message || "Failed to load tasks");
+      }
+
+      const taskList = DOM.get("taskList");
+      data.tasks.forEach((task, index) => {
+        if (taskList.querySelector(`li[data-id='${task.id}']`)) return;
+        const taskElement = TaskManager.createTaskElement(task);
+        taskList.appendChild(taskElement);
+        TaskManager.animateTaskElement(taskElement, index);
+      });
+      this.cursor = data.next_cursor;
+    } catch (error) {
+      Utils.handleError(error, "Failed to load more tasks");
+    }
+  },
+
+  init() {
+    this.reset(window.nextTaskCursor || null);
+    const sentinel = DOM.get("task-list-sentinel");
+    if (!sentinel || !("IntersectionObserver" in window)) return;
+
+    this.observer = new IntersectionObserver(
+      (entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) {
+          this.loadNextPage();
+        }
+      },
+      { rootMargin: "200px" },
+    );
+    this.observer.observe(sentinel);
+  },
+};
+
+//=============================================================================
+// MODULE: Change Feed
+//=============================================================================
+/**
+ * Applies task deltas streamed from /tasks/changes so other tabs and
+ * devices stay current without refetching the whole list
+ */
+const ChangeFeed = {
+  source: null,
+
+  findTaskElement(taskId) {
+    return DOM.get("taskList").querySelector(`li[data-id='${taskId}']`);
+  },
+
+  connected() {
+    return !!this.source && this.source.readyState === EventSource.OPEN;
+  },
+
+  applyAdd(task) {
+    if (this.findTaskElement(task.id)) return;
+    // New tasks go to the end; if more pages remain they arrive with them
+    if (TaskPager.cursor) return;
+    const taskElement = TaskManager.createTaskElement(task);
+    DOM.get("taskList").appendChild(taskElement);
+    TaskManager.animateTaskElement(taskElement);
+  },
+
+  applyUpdate(task) {
+    const current = this.findTaskElement(task.id);
+    // Don't clobber a row the user is editing
+    if (!current || current.contains(document.activeElement)) return;
+    current.replaceWith(TaskManager.createTaskElement(task));
+  },
+
+  applyDelete(taskId) {
+    const current = this.findTaskElement(taskId);
+    if (current) current.remove();
+  },
+
+  async applyReset() {
+    try {
+      const params = new URLSearchParams({ limit: TaskPager.pageSize });
+      const response = await fetch(`/tasks?${params}`);
+      if (!response.ok)
+        throw new Error(`HTTP error! status: ${response.status}`);
+      const data = await response.json();
+      if (data.status !== "success") throw new Error(data.message);
+
+      await TaskManager.updateTaskList(data.tasks, DOM.get("taskList"));
+      TaskPager.reset(data.next_cursor);
+    } catch (error) {
+      console.error("Error reloading tasks:", error);
+    }
+  },
+
+  async handleEvent(event) {
+    const change = JSON.parse(event.data);
+
+    switch (change.op) {
+      case "add":
+        this.applyAdd(change.task);
+        break;
+      case "update":
+        this.applyUpdate(change.task);
+        break;
+      case "delete":
+        this.applyDelete(change.id);
+        break;
+      case "reset":
+        await this.applyReset();
+        break;
+    }
+
+    if (ViewManager.currentView === "matrix") {
+      ViewManager.updateMatrixView();
+    }
+  },
+
+  init() {
+    if (!("EventSource" in window) || !DOM.get("taskList")) return;
+
+    const params = window.taskRevision
+      ? `?${new URLSearchParams({ since: window.taskRevision })}`
+      : "";
+    // EventSource reconnects on its own and resumes via Last-Event-ID
+    this.source = new EventSource(`/tasks/changes${params}`);
+    this.source.onmessage = (event) => this.handleEvent(event);
+  },
+};
+
+//=============================================================================
+// MODULE: Background Jobs
+//=============================================================================
+/**
+ * Runs slow server operations (Drive sync, Magic Sort) as background jobs:
+ * the POST returns 202 at once and the job is polled until it finishes
+ */
+const BackgroundJobs = {
+  pollInterval: 250,
+  maxPollInterval: 2000,
+
+  /**
+   * Resolves to { response, data }. data is the finished job's result, or
+   * null when the server answered inline and response holds the body.
+   */
+  async post(url, headers = {}) {
+    const response = await fetch(url, {
+      method: "POST",
+      headers: { ...headers, Prefer: "respond-async" },
+    });
+    if (response.status !== 202) return { response, data: null };
+
+    const { job } = await response.json();
+    const location = response.headers.get("Location") || `/jobs/${job.id}`;
+    return { response, data: await this.waitFor(location) };
+  },
+
+  async waitFor(location) {
+    let interval = this.pollInterval;
+    for (;;) {
+      await Utils.wait(interval);
+      interval = Math.min(interval * 2, this.maxPollInterval);
+
+      const response = await fetch(location);
+      if (!response.ok)
+        throw new Error(`HTTP error! status: ${response.status}`);
+      const { job } = await response.json();
+
+      if (job.status === "succeeded")
+        return { status: "success", ...job.result };
+      if (job.status === "failed")
+        return { status: "error", message: job.error };
+    }
+  },
+};
+
 //=============================================================================
 // MODULE: Sync Operations
 //=============================================================================
 const SyncManager = {
   syncInProgress: false,
+  etag: null, // Revision of the task list last received from /sync-tasks
 
   async syncTasks(silent = false) {
     if (LoadingState.isLoading || this.syncInProgress) return;
@@ -553,19 +771,34 @@ const SyncManager = {
     );
 
     try {
-      const response = await fetch("/sync-tasks", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-      });
+      const headers = { "Content-Type": "application/json" };
+      if (this.etag) headers["If-None-Match"] = this.etag;
 
-      if (!response.ok)
+      const { response, data: jobResult } = await BackgroundJobs.post(
+        "/sync-tasks",
+        headers,
+      );
+
+      // 304: the list we already show is current, skip re-rendering it
+      const notModified = response.status === 304;
+      if (!response.ok && !notModified)
         throw new Error(`HTTP error! status: ${response.status}`);
-      const data = await response.json();
+      const data =
+        jobResult ||
+        (notModified
+          ? { status: "success", unchanged: true }
+          : await response.json());
 
-      if (data.status === "success" && Array.isArray(data.tasks)) {
-        await TaskManager.updateTaskList(data.tasks, DOM.get("taskList"));
+      if (data.status === "success") {
+        if (Array.isArray(data.tasks)) {
+          await TaskManager.updateTaskList(data.tasks, DOM.get("taskList"));
+          TaskPager.reset(); // Full list received, nothing left to page in
+          this.etag = response.headers.get("ETag");
+        } else if (data.changed && !ChangeFeed.connected()) {
+          // Background syncs report only the outcome. The change feed already
+          // delivers what the merge changed; reload only when it is down
+          await ChangeFeed.applyReset();
+        }
 
         // Update last synced time
         const lastSyncedSpan = document.getElementById("last-synced");
@@ -705,7 +938,10 @@ const ViewManager = {
     });
   },
 
-  updateMatrixView() {
+  async updateMatrixView() {
+    // The list holds only the pages loaded so far; the matrix needs them all
+    if (TaskPager.cursor) await TaskPager.loadAll();
+
     const tasks = Array.from(DOM.get("task-list").children);
     const quadrants = document.querySelectorAll(".quadrant ul");
 
@@ -791,17 +1027,23 @@ const MagicSortManager = {
       LoadingState.start(button);
       button.classList.add("sorting");
 
-      const response = await fetch("/magic-sort", {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-      });
+      const { response, data: jobResult } = await BackgroundJobs.post(
+        "/magic-sort",
+        { "Content-Type": "application/json" },
+      );
 
       if (!response.ok)
         throw new Error(`HTTP error! status: ${response.status}`);
-      const data = await response.json();
+      const data = jobResult || (await response.json());
 
-      if (data.status === "success" && Array.isArray(data.tasks)) {
-        await TaskManager.updateTaskList(data.tasks, DOM.get("taskList"));
+      if (data.status === "success") {
+        if (Array.isArray(data.tasks)) {
+          await TaskManager.updateTaskList(data.tasks, DOM.get("taskList"));
+          TaskPager.reset(); // Full list received, nothing left to page in
+        } else {
+          // Background sorts report only stats; reload the sorted first page
+          await ChangeFeed.applyReset();
+        }
 
         // Update matrix view if needed
         if (ViewManager.currentView === "matrix") {
@@ -1049,6 +1291,8 @@ function initializeApp() {
   EventHandlers.init();
   TaskManager.init();
   ViewManager.init();
+  TaskPager.init();
+  ChangeFeed.init();
 
   // Restore list view to apply consistent styles and animations
   ViewManager.restoreListView();
@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO timestamp as naive local time, the form the app writes"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def is_newer(task: Dict[str, Any], other: Dict[str, Any]) -> bool:
+    """Whether task was updated after other; the rule merges resolve conflicts by"""
+    return parse_timestamp(task['updated_at']) > parse_timestamp(other['updated_at'])
+
+def parse_ndjson(lines: Iterable[Any]) -> Iterator[Optional[Dict[str, Any]]]:
+    """Yield one task per non-empty NDJSON line, or None for a line that
+    isn't a JSON object with an id"""
+    for line in lines:
+        try:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.strip()
+            if not line:
+                continue
+            task = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield task if isinstance(task, dict) and 'id' in task else None
+
+def read_ndjson(lines: Iterable[Any], logger: Optional[logging.Logger] = None) -> Iterator[Dict[str, Any]]:
+    """Yield one task per non-empty NDJSON line, skipping malformed lines"""
+    for number, task in enumerate(parse_ndjson(lines), 1):
+        if task is None:
+            if logger:
+                logger.warning(f"Skipping malformed record {number}")
+            continue
+        yield task
+
+class TaskArchive:
+    """Cold tier for completed tasks, kept out of the hot task list
+
+    Archived tasks live in an NDJSON file, one task per line. Archiving
+    only appends to the file, so it is read only once archived tasks are
+    listed, restored or synced; from then on they are also kept in memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tasks: Optional['OrderedDict[str, Dict[str, Any]]'] = None
+        self._lock = threading.RLock()
+        self._setup_logging()
+        # Drive sync state survives restarts in a small file next to the archive
+        self._sync_path = f"{path}.sync.json"
+        self._sync_state = self._read_sync_state()
+
+    def _setup_logging(self) -> None:
+        """Configure logging"""
+        logging.basicConfig(level=logging.INFO)
+        self.logger = logging.getLogger('TaskArchive')
+
+    @property
+    def loaded(self) -> bool:
+        return self._tasks is not None
+
+    def _load(self) -> 'OrderedDict[str, Dict[str, Any]]':
+        """Read the archive file on first use; later lines win for repeated ids"""
+        with self._lock:
+            if self._tasks is None:
+                tasks: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+                if os.path.exists(self.path):
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        for task in read_ndjson(f, self.logger):
+                            tasks.pop(str(task['id']), None)
+                            tasks[str(task['id'])] = task
+                self._tasks = tasks
+                self.logger.info(f"Loaded {len(tasks)} archived tasks")
+            return self._tasks
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __contains__(self, task_id: str) -> bool:
+        return str(task_id) in self._load()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        return self._load().get(str(task_id))
+
+    #=============================================================================
+    # Changes
+    #=============================================================================
+    def append(self, tasks: List[Dict[str, Any]]) -> None:
+        """Archive tasks by appending them to the file, without reading it"""
+        if not tasks:
+            return
+        archived_at = datetime.now().isoformat()
+        records = [{**task, 'archived_at': archived_at} for task in tasks]
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(record) + '\n' for record in records))
+            if self._tasks is not None:
+                for record in records:
+                    self._tasks.pop(str(record['id']), None)
+                    self._tasks[str(record['id'])] = record
+
+    def remove(self, task_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Take tasks out of the archive, returning them without archive metadata"""
+        with self._lock:
+            tasks = self._load()
+            removed = []
+            for task_id in task_ids:
+                record = tasks.pop(str(task_id), None)
+                if record is not None:
+                    removed.append({key: value for key, value in record.items() if key != 'archived_at'})
+            if removed:
+                self._rewrite()
+            return removed
+
+    def merge(self, incoming: Iterable[Dict[str, Any]]) -> int:
+        """Add archived tasks from elsewhere; the newer updated_at wins for known ids"""
+        with self._lock:
+            tasks = self._load()
+            changed = 0
+            for task in incoming:
+                task_id = str(task['id'])
+                current = tasks.get(task_id)
+                if current is None or is_newer(task, current):
+                    tasks.pop(task_id, None)
+                    tasks[task_id] = task
+                    changed += 1
+            if changed:
+                self._rewrite()
+            return changed
+
+    def _rewrite(self) -> None:
+        """Write the whole archive atomically; call under the lock"""
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for record in self._tasks.values():
+                f.write(json.dumps(record) + '\n')
+        os.replace(temp_file, self.path)
+
+    #=============================================================================
+    # Drive Sync State
+    #=============================================================================
+    def _read_sync_state(self) -> Dict[str, Any]:
+        try:
+            with open(self._sync_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def signature(self) -> Optional[str]:
+        """Identifies the file's current contents (size and mtime); None if absent"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    @property
+    def cloud_version(self) -> Optional[str]:
+        """Drive modifiedTime of the copy last downloaded or uploaded"""
+        return self._sync_state.get('cloud_version')
+
+    @property
+    def needs_upload(self) -> bool:
+        """Whether the file changed since it was last uploaded"""
+        signature = self.signature()
+        return signature is not None and signature != self._sync_state.get('uploaded')
+
+    def mark_synced(self, cloud_version: Optional[str], uploaded: Optional[str] = None) -> None:
+        """Record the Drive copy now matched, and the signature uploaded if any"""
+        with self._lock:
+            state = {**self._sync_state, 'cloud_version': cloud_version}
+            if uploaded is not None:
+                state['uploaded'] = uploaded
+            temp_file = f"{self._sync_path}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(temp_file, self._sync_path)
+            self._sync_state = state
+
+    #=============================================================================
+    # Queries
+    #=============================================================================
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Yield archived tasks with archive metadata, without loading the archive
+        
+        Streams the file when it isn't loaded yet; an id archived more than
+        once then appears once per archiving, the last copy being current.
+        """
+        with self._lock:
+            snapshot = list(self._tasks.values()) if self._tasks is not None else None
+        if snapshot is not None:
+            yield from snapshot
+        elif os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                yield from read_ndjson(f, self.logger)
+
+    def page(self, offset: int = 0, limit: int = 50) -> Tuple[List[Dict[str, Any]], int]:
+        """Return a page of archived tasks, most recently archived first, and the total"""
+        if offset < 0 or limit < 1:
+            raise ValueError("offset must be >= 0 and limit >= 1")
+        with self._lock:
+            tasks = self._load()
+            return list(islice(reversed(tasks.values()), offset, offset + limit)), len(tasks)
@@ -0,0 +1,198 @@
+import base64
+import heapq
+import json
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SORT_FIELDS = ('position', 'created_at', 'updated_at')
+SORT_ORDERS = ('asc', 'desc')
+
+Entry = Tuple[Any, str]
+BucketKey = Tuple[str, bool]
+
+class TaskIndex:
+    """In-memory secondary indexes over tasks for paginated listing
+
+    Tasks are partitioned into buckets by (quadrant, completed). Each bucket
+    keeps one sorted list of (sort key, task id) per sort field, so a filtered
+    page is served by bisecting to the cursor in each matching bucket and
+    lazily merging them, at a cost proportional to the page size.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._positions: Dict[str, int] = {}
+        self._entries: Dict[str, Tuple[BucketKey, Dict[str, Entry]]] = {}
+        self._buckets: Dict[BucketKey, Dict[str, List[Entry]]] = {}
+        self._next_position = 0
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, task_id: str) -> bool:
+        return str(task_id) in self._tasks
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return the indexed task with the given id"""
+        return self._tasks.get(str(task_id))
+
+    #=============================================================================
+    # Maintenance
+    #=============================================================================
+    def rebuild(self, tasks: Iterable[Dict[str, Any]]) -> None:
+        """Rebuild all indexes, assigning positions in list order"""
+        self._tasks.clear()
+        self._positions.clear()
+        self._entries.clear()
+        self._buckets.clear()
+        self._next_position = 0
+
+        for task in tasks:
+            task_id = str(task['id'])
+            self._tasks[task_id] = task
+            self._positions[task_id] = self._next_position
+            self._next_position += 1
+            bucket_key, entries = self._make_entries(task_id, task)
+            self._entries[task_id] = (bucket_key, entries)
+            bucket = self._buckets.setdefault(bucket_key, {field: [] for field in SORT_FIELDS})
+            for field, entry in entries.items():
+                bucket[field].append(entry)
+
+        for bucket in self._buckets.values():
+            for entries in bucket.values():
+                entries.sort()
+
+    def add(self, task: Dict[str, Any]) -> None:
+        """Index a task appended to the end of the list"""
+        task_id = str(task['id'])
+        if task_id in self._tasks:
+            self.update(task)
+            return
+        self._tasks[task_id] = task
+        self._positions[task_id] = self._next_position
+        self._next_position += 1
+        self._insert(task_id, task)
+
+    def update(self, task: Dict[str, Any]) -> None:
+        """Re-index a task whose fields changed, keeping its position"""
+        task_id = str(task['id'])
+        if task_id not in self._tasks:
+            self.add(task)
+            return
+        self._discard(task_id)
+        self._tasks[task_id] = task
+        self._insert(task_id, task)
+
+    def remove(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Drop a task from all indexes"""
+        task_id = str(task_id)
+        if task_id not in self._tasks:
+            return None
+        self._discard(task_id)
+        self._positions.pop(task_id, None)
+        return self._tasks.pop(task_id)
+
+    def _make_entries(self, task_id: str, task: Dict[str, Any]) -> Tuple[BucketKey, Dict[str, Entry]]:
+        bucket_key = (task.get('quadrant') or '', bool(task.get('completed', False)))
+        entries = {
+            'position': (self._positions[task_id], task_id),
+            'created_at': (task.get('created_at') or '', task_id),
+            'updated_at': (task.get('updated_at') or '', task_id)
+        }
+        return bucket_key, entries
+
+    def _insert(self, task_id: str, task: Dict[str, Any]) -> None:
+        bucket_key, entries = self._make_entries(task_id, task)
+        self._entries[task_id] = (bucket_key, entries)
+        bucket = self._buckets.setdefault(bucket_key, {field: [] for field in SORT_FIELDS})
+        for field, entry in entries.items():
+            insort(bucket[field], entry)
+
+    def _discard(self, task_id: str) -> None:
+        bucket_key, entries = self._entries.pop(task_id)
+        bucket = self._buckets[bucket_key]
+        for field, entry in entries.items():
+            sorted_entries = bucket[field]
+            i = bisect_left(sorted_entries, entry)
+            if i < len(sorted_entries) and sorted_entries[i] == entry:
+                del sorted_entries[i]
+        if not bucket['position']:
+            del self._buckets[bucket_key]
+
+    #=============================================================================
+    # Queries
+    #=============================================================================
+    @staticmethod
+    def encode_cursor(sort: str, order: str, entry: Entry) -> str:
+        payload = json.dumps([sort, order, entry[0], entry[1]], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort: str, order: str) -> Entry:
+        try:
+            cursor_sort, cursor_order, key, task_id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if cursor_sort != sort or cursor_order != order:
+            raise ValueError("Cursor does not match sort options")
+        return key, task_id
+
+    @classmethod
+    def validate_query(cls, sort: str, order: str, cursor: Optional[str], limit: int) -> Optional[Entry]:
+        """Raise ValueError for unusable query options; returns the decoded cursor"""
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {sort}")
+        if order not in SORT_ORDERS:
+            raise ValueError(f"Unsupported sort order: {order}")
+        if limit < 1:
+            raise ValueError("Limit must be at least 1")
+        return cls.decode_cursor(cursor, sort, order) if cursor else None
+
+    def _scan(self, entries: List[Entry], sort: str, descending: bool,
+              after: Optional[Entry], since: Optional[str]) -> Iterator[Entry]:
+        """Yield entries of one bucket in sort order, starting after the cursor"""
+        if not descending:
+            start = bisect_right(entries, after) if after else 0
+            if since and sort == 'updated_at':
+                start = max(start, bisect_left(entries, (since, '')))
+            for i in range(start, len(entries)):
+                yield entries[i]
+        else:
+            start = bisect_left(entries, after) if after else len(entries)
+            for i in range(start - 1, -1, -1):
+                if since and sort == 'updated_at' and entries[i][0] < since:
+                    return
+                yield entries[i]
+
+    def query(self, quadrants: Optional[List[str]] = None, completed: Optional[bool] = None,
+              updated_since: Optional[str] = None, sort: str = 'position', order: str = 'asc',
+              cursor: Optional[str] = None, limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return one page of tasks and the cursor for the next page
+
+        Filtering on ``updated_since`` is index-backed when sorting by
+        ``updated_at``; with other sort fields it is applied while scanning.
+        """
+        after = self.validate_query(sort, order, cursor, limit)
+        descending = order == 'desc'
+        wanted_quadrants = set(quadrants) if quadrants is not None else None
+
+        scans = [
+            self._scan(bucket[sort], sort, descending, after, updated_since)
+            for (quadrant, is_completed), bucket in self._buckets.items()
+            if (wanted_quadrants is None or quadrant in wanted_quadrants)
+            and (completed is None or is_completed == completed)
+        ]
+
+        page: List[Dict[str, Any]] = []
+        last_entry: Optional[Entry] = None
+        for entry in heapq.merge(*scans, reverse=descending):
+            task = self._tasks[entry[1]]
+            if updated_since and sort != 'updated_at' and (task.get('updated_at') or '') < updated_since:
+                continue
+            if len(page) == limit:
+                return page, self.encode_cursor(sort, order, last_entry)
+            page.append(task)
+            last_entry = entry
+
+        return page, None
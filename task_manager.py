@@ -1,20 +1,65 @@
 import json
 import os
+import hashlib
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from uuid import uuid4
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Any
+from task_index import TaskIndex
+from search_index import SearchIndex
+from task_archive import TaskArchive, is_newer, parse_ndjson, parse_timestamp
+from metrics import registry, BYTE_BUCKETS, FAST_BUCKETS, LOCK_BUCKETS
+
+STORAGE_DURATION = registry.histogram(
+    'task_storage_duration_seconds', 'Duration of tasks file loads and saves',
+    labels=('operation',), buckets=FAST_BUCKETS)
+STORAGE_BYTES = registry.histogram(
+    'task_storage_bytes', 'Size of the tasks file read or written',
+    labels=('operation',), buckets=BYTE_BUCKETS)
+LOCK_WAIT = registry.histogram(
+    'task_manager_lock_wait_seconds', 'Time spent waiting for the TaskManager lock',
+    buckets=LOCK_BUCKETS)
+TASK_COUNT = registry.gauge('tasks', 'Tasks currently held in memory')
+
+# Receives (revision, changes) after every persisted mutation
+ChangeListener = Callable[[int, List[Dict[str, Any]]], None]
 
 class TaskManager:
     """Manages tasks with local storage and version control"""
     
-    def __init__(self):
+    # During imports, wait this many times the last save's duration before
+    # saving again, so rewriting the tasks file stays a fraction of the work
+    IMPORT_SAVE_SPACING = 4
+    
+    def __init__(self, tasks_file: Optional[str] = None, archive_file: Optional[str] = None,
+                 archive_after_days: float = 0):
+        """Load tasks from tasks_file
+        
+        Completed tasks not updated for archive_after_days move to the
+        archive file (by default next to tasks_file) on load and on each
+        archive_completed() call; 0 disables the automatic sweep.
+        """
         self.tasks: List[Dict] = []
         self.last_sync: Optional[str] = None
-        self.tasks_file = os.path.join(Path(__file__).parent, 'tasks.json')
+        self.tasks_file = tasks_file or os.path.join(Path(__file__).parent, 'tasks.json')
+        self.archive = TaskArchive(archive_file or f"{os.path.splitext(self.tasks_file)[0]}_archive.ndjson")
+        self.archive_after_days = archive_after_days
+        self.index = TaskIndex()
+        self.search_index = SearchIndex()
+        self.revision = 0
+        self._unsaved = False  # Import chunks applied but not yet in the tasks file
+        self._epoch = uuid4().hex[:8]  # Keeps ETags unique across restarts
+        self._lock = threading.RLock()
+        self._listeners: List[ChangeListener] = []
         self._setup_logging()
+        TASK_COUNT.set_function(lambda: len(self.tasks))
         self.load_tasks()
+        if self.archive_after_days:
+            self.archive_completed()
 
     def _setup_logging(self) -> None:
         """Configure logging for the task manager"""
@@ -36,6 +81,63 @@ class TaskManager:
             
         return task_copy
 
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the task lock, recording how long acquiring it took"""
+        started = time.perf_counter()
+        self._lock.acquire()
+        LOCK_WAIT.observe(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    @property
+    def epoch(self) -> str:
+        """Identifies this process's revision sequence"""
+        return self._epoch
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Register a callback for task deltas (add, update, delete, reset)"""
+        self._listeners.append(listener)
+
+    def _notify(self, changes: List[Dict[str, Any]]) -> None:
+        """Publish deltas tagged with the current revision; call under the lock"""
+        if not changes:
+            return
+        for listener in self._listeners:
+            try:
+                listener(self.revision, changes)
+            except Exception as e:
+                self.logger.error(f"Change listener failed: {str(e)}")
+
+    def _diff(self, old_tasks: List[Dict], new_tasks: List[Dict]) -> List[Dict[str, Any]]:
+        """Per-task deltas between two lists, or a reset if the order changed"""
+        old_by_id = {str(t['id']): t for t in old_tasks}
+        new_ids = {str(t['id']) for t in new_tasks}
+        kept_old = [str(t['id']) for t in old_tasks if str(t['id']) in new_ids]
+        kept_new = [str(t['id']) for t in new_tasks if str(t['id']) in old_by_id]
+        if kept_old != kept_new:
+            return [{'op': 'reset'}]
+
+        changes = [{'op': 'delete', 'id': task_id} for task_id in old_by_id if task_id not in new_ids]
+        for task in new_tasks:
+            old = old_by_id.get(str(task['id']))
+            if old is None:
+                changes.append({'op': 'add', 'task': self._prepare_task_for_response(task)})
+            elif old != task:
+                changes.append({'op': 'update', 'task': self._prepare_task_for_response(task)})
+        return changes
+
+    def etag(self, scope: str = '') -> str:
+        """Entity tag for the current task list revision
+
+        Cheap to compute: no task is serialized. The scope distinguishes
+        different representations of the same revision (user, query string).
+        """
+        scope_hash = hashlib.blake2s(scope.encode('utf-8'), digest_size=6).hexdigest()
+        return f"{self._epoch}-{self.revision}-{scope_hash}"
+
     def createTaskElement(self, task: Dict[str, Any]) -> str:
         """Create task element with quadrant class if available"""
         task_data = self._prepare_task_for_response(task)
@@ -47,10 +149,19 @@ class TaskManager:
     #=============================================================================
     def load_tasks(self) -> List[Dict]:
         """Load tasks from local storage"""
+        with self._locked(), STORAGE_DURATION.time(operation='load'):
+            return self._load_tasks()
+
+    def _load_tasks(self) -> List[Dict]:
+        if self._unsaved:
+            # The file is behind the list; loading it would drop imported tasks
+            self.logger.warning("Not reloading tasks file while an import is unsaved")
+            return [self._prepare_task_for_response(task) for task in self.tasks]
         try:
             if os.path.exists(self.tasks_file):
                 with open(self.tasks_file, 'r') as f:
                     content = f.read().strip()
+                    STORAGE_BYTES.observe(len(content), operation='load')
                     if not content:  # Handle empty file
                         self.logger.info("Tasks file is empty, initializing with defaults")
                         self.save_tasks()  # Create initial structure
@@ -59,8 +170,14 @@ class TaskManager:
                     data = json.loads(content)
                     # Check if data is in the new format (dict with metadata)
                     if isinstance(data, dict):
-                        self.tasks = data.get('tasks', [])
+                        loaded_tasks = data.get('tasks', [])
+                        changed = loaded_tasks != self.tasks
+                        if changed:
+                            self.revision += 1
+                        self.tasks = loaded_tasks
                         self.last_sync = data.get('last_sync')
+                        if changed:
+                            self._notify([{'op': 'reset'}])
                     else:
                         # Handle legacy format (list of tasks)
                         self.tasks = data if isinstance(data, list) else []
@@ -68,7 +185,9 @@ class TaskManager:
                         # Migrate to new format
                         self.save_tasks()
                     
-                self.logger.info(f"Loaded {len(self.tasks)} tasks")
+                self.index.rebuild(self.tasks)
+                self.search_index.sync(self.tasks)
+                self.logger.debug(f"Loaded {len(self.tasks)} tasks")
                 # Ensure each task has its quadrant data preserved
                 prepared_tasks = [self._prepare_task_for_response(task) for task in self.tasks]
                 return prepared_tasks
@@ -79,21 +198,49 @@ class TaskManager:
 
     def save_tasks(self) -> bool:
         """Save tasks to local storage"""
+        with self._locked(), STORAGE_DURATION.time(operation='save'):
+            return self._save_tasks()
+
+    def _save_tasks(self) -> bool:
+        # Every mutation persists through here, so this is where the list changes
+        self.revision += 1
+        return self._write_tasks()
+
+    def _write_tasks(self) -> bool:
+        """Write the list to the tasks file without a new revision; call under the lock"""
         try:
             current_time = datetime.now().isoformat()
             data = {
                 'tasks': self.tasks,
                 'last_sync': current_time
             }
-            with open(self.tasks_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Write a sibling file and swap it in, so readers such as the
+            # Drive upload never see a half-written file
+            temp_file = f"{self.tasks_file}.{uuid4().hex[:8]}.tmp"
+            try:
+                with open(temp_file, 'w') as f:
+                    json.dump(data, f, indent=2)
+                    STORAGE_BYTES.observe(f.tell(), operation='save')
+                os.replace(temp_file, self.tasks_file)
+            finally:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
             self.last_sync = current_time
-            self.logger.info(f"Saved {len(self.tasks)} tasks at {current_time}")
+            self._unsaved = False
+            self.logger.debug(f"Saved {len(self.tasks)} tasks at {current_time}")
             return True
         except Exception as e:
             self.logger.error(f"Error saving tasks: {str(e)}")
             return False
 
+    def flush(self) -> bool:
+        """Write changes not yet in the tasks file, e.g. before uploading it"""
+        with self._locked():
+            if not self._unsaved:
+                return True
+            with STORAGE_DURATION.time(operation='save'):
+                return self._write_tasks()
+
     #=============================================================================
     # Task Operations
     #=============================================================================
@@ -110,17 +257,22 @@ class TaskManager:
             'updated_at': datetime.now().isoformat(),
             'quadrant': ""  # Initialize with empty quadrant for unsorted tasks
         }
-        self.tasks.append(task)
-        self.save_tasks()
-        self.logger.info(f"Added task: {task['id']}")
+        with self._locked():
+            self.tasks.append(task)
+            self.index.add(task)
+            self.search_index.add(task)
+            self.save_tasks()
+            self._notify([{'op': 'add', 'task': self._prepare_task_for_response(task)}])
+        self.logger.debug(f"Added task: {task['id']}")
         return self._prepare_task_for_response(task)
 
     def update_task(self, task_id: str, content: Optional[str] = None, 
                     completed: Optional[bool] = None) -> Optional[Dict]:
         """Update an existing task"""
         try:
-            for task in self.tasks:
-                if str(task['id']) == str(task_id):
+            with self._locked():
+                task = self.index.get(task_id)
+                if task is not None:
                     if content is not None:
                         if not content.strip():
                             raise ValueError("Task content cannot be empty")
@@ -128,8 +280,11 @@ class TaskManager:
                     if completed is not None:
                         task['completed'] = bool(completed)
                     task['updated_at'] = datetime.now().isoformat()
+                    self.index.update(task)
+                    self.search_index.update(task)
                     self.save_tasks()
-                    self.logger.info(f"Updated task: {task_id}")
+                    self._notify([{'op': 'update', 'task': self._prepare_task_for_response(task)}])
+                    self.logger.debug(f"Updated task: {task_id}")
                     return self._prepare_task_for_response(task)
             self.logger.warning(f"Task not found: {task_id}")
             return None
@@ -139,20 +294,307 @@ class TaskManager:
 
     def delete_task(self, task_id: str) -> bool:
         """Delete a task by ID"""
-        initial_length = len(self.tasks)
-        self.tasks = [t for t in self.tasks if str(t['id']) != str(task_id)]
-        if len(self.tasks) < initial_length:
-            self.save_tasks()
-            self.logger.info(f"Deleted task: {task_id}")
-            return True
+        with self._locked():
+            if task_id is not None and self.index.remove(task_id) is not None:
+                self.search_index.remove(task_id)
+                self.tasks = [t for t in self.tasks if str(t['id']) != str(task_id)]
+                self.save_tasks()
+                self._notify([{'op': 'delete', 'id': str(task_id)}])
+                self.logger.debug(f"Deleted task: {task_id}")
+                return True
         self.logger.warning(f"Task not found for deletion: {task_id}")
         return False
 
+    def replace_tasks(self, tasks: List[Dict]) -> bool:
+        """Replace the whole task list, e.g. after Magic Sort reorders it"""
+        with self._locked():
+            changes = self._diff(self.tasks, tasks)
+            self.tasks = tasks
+            self.index.rebuild(self.tasks)
+            self.search_index.sync(self.tasks)
+            saved = self.save_tasks()
+            self._notify(changes)
+            return saved
+
+    def apply_categorizations(self, categorizations: Dict[str, Dict[str, Any]],
+                              sort_key: Optional[Callable[[Dict[str, Any]], Any]] = None) -> List[Dict]:
+        """Apply Magic Sort fields by task id to the current tasks, then reorder
+        
+        Works on the list as it is now rather than the one that was sorted,
+        so tasks added while the sort ran are kept and ids deleted meanwhile
+        are skipped.
+        """
+        with self._locked():
+            tasks = []
+            for task in self.tasks:
+                fields = categorizations.get(str(task['id']))
+                tasks.append({**task, **fields} if fields else task)
+            if sort_key is not None:
+                tasks.sort(key=sort_key)
+            self.replace_tasks(tasks)
+            return [self._prepare_task_for_response(task) for task in tasks]
+
+    def snapshot(self, scope: str = '') -> Tuple[List[Dict], str]:
+        """Return every task prepared for the frontend and the ETag of that revision
+        
+        Both are read under one lock hold, so the tag always matches the list.
+        """
+        with self._locked():
+            return [self._prepare_task_for_response(task) for task in self.tasks], self.etag(scope)
+
+    def list_tasks(self, quadrants: Optional[List[str]] = None, completed: Optional[bool] = None,
+                   updated_since: Optional[str] = None, sort: str = 'position', order: str = 'asc',
+                   cursor: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """Return one page of tasks served from the in-memory indexes"""
+        with self._locked():
+            page, next_cursor = self.index.query(
+                quadrants=quadrants, completed=completed, updated_since=updated_since,
+                sort=sort, order=order, cursor=cursor, limit=limit)
+            return {
+                'tasks': [self._prepare_task_for_response(task) for task in page],
+                'next_cursor': next_cursor
+            }
+
+    def search_tasks(self, query: str, limit: int = 20) -> List[Dict]:
+        """Return the best matching tasks for a search query, with scores"""
+        with self._locked():
+            results = []
+            for task_id, score in self.search_index.search(query, limit=limit):
+                task = self.index.get(task_id)
+                if task is not None:
+                    results.append({**self._prepare_task_for_response(task), 'score': score})
+            return results
+
+    #=============================================================================
+    # Archive Operations
+    #=============================================================================
+    def archive_completed(self, older_than_days: Optional[float] = None) -> int:
+        """Move completed tasks not updated for older_than_days to the archive"""
+        days = self.archive_after_days if older_than_days is None else older_than_days
+        if older_than_days is None and not days:
+            return 0
+        cutoff = datetime.now() - timedelta(days=days)
+        
+        def is_stale(task: Dict[str, Any]) -> bool:
+            # Tasks merged from Drive may carry offset-aware timestamps
+            updated_at = task.get('updated_at')
+            return not updated_at or parse_timestamp(updated_at) < cutoff
+        
+        with self._locked():
+            stale = [task for task in self.tasks if task.get('completed') and is_stale(task)]
+            if not stale:
+                return 0
+            self.archive.append(stale)
+            stale_ids = {str(task['id']) for task in stale}
+            self.tasks = [task for task in self.tasks if str(task['id']) not in stale_ids]
+            self.index.rebuild(self.tasks)
+            self.search_index.sync(self.tasks)
+            self.save_tasks()
+            self._notify([{'op': 'delete', 'id': task_id} for task_id in stale_ids])
+        self.logger.info(f"Archived {len(stale)} completed tasks")
+        return len(stale)
+
+    def list_archived(self, offset: int = 0, limit: int = 50) -> Dict[str, Any]:
+        """Return a page of archived tasks, most recently archived first"""
+        tasks, total = self.archive.page(offset, limit)
+        return {
+            'tasks': [self._prepare_task_for_response(task) for task in tasks],
+            'total': total,
+            'next_offset': offset + limit if offset + limit < total else None
+        }
+
+    def restore_tasks(self, task_ids: List[str]) -> List[Dict]:
+        """Move archived tasks back into the active list"""
+        with self._locked():
+            restored = [task for task in self.archive.remove(task_ids)
+                        if str(task['id']) not in self.index]
+            if not restored:
+                return []
+            now = datetime.now().isoformat()
+            for task in restored:
+                task['updated_at'] = now  # Keeps the next sweep from archiving it again
+                self.tasks.append(task)
+                self.index.add(task)
+                self.search_index.add(task)
+            self.save_tasks()
+            prepared = [self._prepare_task_for_response(task) for task in restored]
+            self._notify([{'op': 'add', 'task': task} for task in prepared])
+        self.logger.info(f"Restored {len(restored)} archived tasks")
+        return prepared
+
+    def merge_archive(self, cloud_archived: Iterable[Dict[str, Any]]) -> int:
+        """Fold another device's archive into ours; tasks still active here stay active"""
+        with self._locked():
+            return self.archive.merge(task for task in cloud_archived
+                                      if str(task['id']) not in self.index)
+
+    def _filter_archived(self, incoming: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop incoming tasks archived here unless the incoming copy is newer
+        
+        Newer copies are taken out of the archive so they can rejoin the
+        task list. Call under the lock with tasks not in the list.
+        """
+        kept, reclaimed = [], []
+        for task in incoming:
+            archived = self.archive.get(task['id'])
+            if archived is None:
+                kept.append(task)
+            elif is_newer(task, archived):
+                kept.append(task)
+                reclaimed.append(task['id'])
+        if reclaimed:
+            self.archive.remove(reclaimed)
+        return kept
+
+    #=============================================================================
+    # Bulk Import/Export
+    #=============================================================================
+    def export_tasks(self, include_archived: bool = False) -> Iterator[str]:
+        """Yield tasks as NDJSON lines, one task at a time
+        
+        Serializes a snapshot of the list taken up front, so the lock is
+        not held while the caller writes lines out. Archived tasks follow
+        the active ones and keep their archived_at field.
+        """
+        with self._locked():
+            snapshot = list(self.tasks)
+        for task in snapshot:
+            yield json.dumps(task) + '\n'
+        if include_archived:
+            for record in self.archive.records():
+                yield json.dumps(record) + '\n'
+
+    def import_tasks(self, lines: Iterable[Any], chunk_size: int = 1000) -> Dict[str, int]:
+        """Import tasks from NDJSON lines (str or bytes), in chunks
+        
+        Each chunk of up to chunk_size tasks is applied under one lock hold,
+        so memory use is bounded by the chunk rather than the input and
+        other requests run between chunks. Tasks with a known id replace
+        the existing one only when their updated_at is newer, as in
+        merge_tasks; records carrying archived_at go to the archive.
+        
+        Saving rewrites the whole tasks file, so chunks are saved at most
+        every IMPORT_SAVE_SPACING save durations, and once at the end.
+        Until then the file lags the list: load_tasks() keeps the list and
+        uploads should flush() first.
+        
+        Returns:
+            Counts of added, updated, unchanged, archived and invalid records
+        """
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'archived': 0, 'invalid': 0}
+        next_save = 0.0
+        
+        def commit(tasks: List[Dict[str, Any]], final: bool = False) -> None:
+            nonlocal next_save
+            self._import_chunk(tasks, stats)
+            if self._unsaved and (final or time.perf_counter() >= next_save):
+                started = time.perf_counter()
+                # Chunks already took and published their revisions
+                self.flush()
+                finished = time.perf_counter()
+                next_save = finished + self.IMPORT_SAVE_SPACING * (finished - started)
+        
+        chunk: Dict[str, Dict[str, Any]] = {}
+        for record in parse_ndjson(lines):
+            task = self._normalize_import(record) if record is not None else None
+            if task is None:
+                stats['invalid'] += 1
+                continue
+            current = chunk.get(task['id'])
+            if current is not None:
+                stats['unchanged'] += 1  # Only one copy per id is applied
+            if current is None or is_newer(task, current):
+                chunk[task['id']] = task
+            if len(chunk) >= chunk_size:
+                commit(list(chunk.values()))
+                chunk = {}
+        commit(list(chunk.values()), final=True)
+        self.logger.info(f"Imported tasks: {stats}")
+        return stats
+
+    @staticmethod
+    def _local_timestamp(value: Any) -> Optional[str]:
+        """ISO timestamp as naive local time, the form the app writes; None if invalid"""
+        try:
+            return parse_timestamp(value).isoformat()
+        except (TypeError, ValueError):
+            return None
+
+    def _normalize_import(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the record as a task, or None if it can't be one"""
+        task_id = record['id']
+        content = record.get('content')
+        if (not isinstance(task_id, (str, int)) or isinstance(task_id, bool) or task_id == ''
+                or not isinstance(content, str) or not content.strip()):
+            return None
+        now = datetime.now().isoformat()
+        task = {**record, 'id': str(task_id), 'content': content.strip()}
+        task.setdefault('completed', False)
+        task.setdefault('quadrant', '')
+        # Mixed naive and offset-aware timestamps could not be compared
+        for field in ('created_at', 'updated_at'):
+            task[field] = self._local_timestamp(task.get(field, now))
+            if task[field] is None:
+                return None
+        return task
+
+    def _import_chunk(self, tasks: List[Dict[str, Any]], stats: Dict[str, int]) -> bool:
+        """Apply one chunk of imported tasks; True if the task list changed"""
+        archived = [task for task in tasks if 'archived_at' in task]
+        with self._locked():
+            if archived:
+                merged = self.merge_archive(archived)
+                stats['archived'] += merged
+                stats['unchanged'] += len(archived) - merged
+            
+            changes = []
+            new_tasks = []
+            positions: Optional[Dict[str, int]] = None
+            for task in tasks:
+                if 'archived_at' in task:
+                    continue
+                current = self.index.get(task['id'])
+                if current is None:
+                    new_tasks.append(task)
+                elif is_newer(task, current):
+                    # Swap in the new dict at the same list position; exports
+                    # serialize the old one outside the lock
+                    if positions is None:
+                        positions = {str(t['id']): i for i, t in enumerate(self.tasks)}
+                    self.tasks[positions[task['id']]] = task
+                    self.index.update(task)
+                    self.search_index.update(task)
+                    changes.append({'op': 'update', 'task': self._prepare_task_for_response(task)})
+                    stats['updated'] += 1
+                else:
+                    stats['unchanged'] += 1
+            
+            added = self._filter_archived(new_tasks)
+            stats['unchanged'] += len(new_tasks) - len(added)
+            for task in added:
+                self.tasks.append(task)
+                self.index.add(task)
+                self.search_index.add(task)
+                changes.append({'op': 'add', 'task': self._prepare_task_for_response(task)})
+            stats['added'] += len(added)
+            
+            if not changes:
+                return False
+            # Written to the file by import_tasks or flush(), possibly chunks later
+            self.revision += 1
+            self._unsaved = True
+            self._notify(changes)
+            return True
+
     #=============================================================================
     # Sync Operations
     #=============================================================================
     def merge_tasks(self, cloud_data: Dict[str, Any]) -> bool:
         """Merge cloud data with local data based on timestamps"""
+        with self._locked():
+            return self._merge_tasks(cloud_data)
+
+    def _merge_tasks(self, cloud_data: Dict[str, Any]) -> bool:
         try:
             cloud_tasks = cloud_data.get('tasks', [])
             cloud_sync_time = cloud_data.get('last_sync')
@@ -164,9 +606,17 @@ class TaskManager:
             local_tasks_map = {task['id']: task for task in self.tasks}
             cloud_tasks_map = {task['id']: task for task in cloud_tasks}
             
-            # Merge tasks
+            # Only cloud-only ids can be archived here
+            cloud_only = self._filter_archived([task for task_id, task in cloud_tasks_map.items()
+                                                if task_id not in local_tasks_map])
+            kept_ids = {task['id'] for task in cloud_only}
+            cloud_tasks_map = {task_id: task for task_id, task in cloud_tasks_map.items()
+                               if task_id in local_tasks_map or task_id in kept_ids}
+            
+            # Merge tasks, keeping local order and appending cloud-only tasks
             merged_tasks = []
-            all_task_ids = set(local_tasks_map.keys()) | set(cloud_tasks_map.keys())
+            all_task_ids = list(local_tasks_map) + [task_id for task_id in cloud_tasks_map
+                                                    if task_id not in local_tasks_map]
             
             for task_id in all_task_ids:
                 local_task = local_tasks_map.get(task_id)
@@ -177,13 +627,15 @@ class TaskManager:
                 elif not cloud_task:
                     merged_tasks.append(local_task)
                 else:
-                    local_updated = datetime.fromisoformat(local_task['updated_at'])
-                    cloud_updated = datetime.fromisoformat(cloud_task['updated_at'])
-                    merged_tasks.append(cloud_task if cloud_updated > local_updated else local_task)
+                    merged_tasks.append(cloud_task if is_newer(cloud_task, local_task) else local_task)
             
             if merged_tasks != self.tasks:
+                changes = self._diff(self.tasks, merged_tasks)
                 self.tasks = merged_tasks
+                self.index.rebuild(self.tasks)
+                self.search_index.sync(self.tasks)
                 self.save_tasks()
+                self._notify(changes)
                 self.logger.info("Merged tasks with cloud version")
                 return True
                 